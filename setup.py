@@ -31,6 +31,7 @@ setup(
     ],
     install_requires=[
         'Django>=1.8,<1.9',
+        'futures; python_version<"3"',
         'jsonfield',
         'six>=1.10.0,<1.11'
     ],
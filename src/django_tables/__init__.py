@@ -1,9 +1,11 @@
 from __future__ import absolute_import
 
+default_app_config = 'django_tables.apps.DjangoConfigurableTablesAppConfig'
 
 from django_tables.base import (
     get_tables,
     Row,
     Table,
+    warm_template_name_cache,
 )
 from django_tables.views import ConfigurableTableView
@@ -1,6 +1,41 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started, setting_changed
+from django.db.models.signals import post_delete, post_save
+
+
+def clear_template_name_cache_in_debug(**kwargs):
+    """
+    Templates may change on disk while developing, so resolved template names are only kept for a single request.
+    """
+
+    from django_tables.base import clear_template_name_cache
+
+    if settings.DEBUG:
+        clear_template_name_cache()
+
+
+def clear_template_name_cache_on_setting_change(setting, **kwargs):
+
+    from django_tables.base import clear_template_name_cache
+
+    if setting in ('TEMPLATES', 'DEBUG'):
+        clear_template_name_cache()
 
 
 class DjangoConfigurableTablesAppConfig(AppConfig):
     name = 'django_tables'
     verbose_name = 'Django Tables'
+
+    def ready(self):
+        request_started.connect(clear_template_name_cache_in_debug, dispatch_uid='django_tables_template_name_cache')
+        setting_changed.connect(
+            clear_template_name_cache_on_setting_change,
+            dispatch_uid='django_tables_template_name_cache_setting'
+        )
+
+        from django_tables.cache import remove_cached_configuration, update_cached_configuration
+        from django_tables.models import TableConfiguration
+
+        post_save.connect(update_cached_configuration, sender=TableConfiguration, dispatch_uid='django_tables_cache')
+        post_delete.connect(remove_cached_configuration, sender=TableConfiguration, dispatch_uid='django_tables_cache')
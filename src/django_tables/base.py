@@ -1,20 +1,35 @@
 from __future__ import unicode_literals
 
-import copy
+import os
 
+from django.core.exceptions import ImproperlyConfigured
 from django.template import TemplateDoesNotExist
+from django.template.context import BaseContext
+from django.template.engine import Engine
 from django.template.loader import get_template, render_to_string
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 import six
 
 from .column import Column
 
 
-DEFAULT_NAMES = ('empty_message', 'template_directory', 'default_columns', 'context_name')
+DEFAULT_NAMES = (
+    'empty_message', 'template_directory', 'default_columns', 'default_order_by', 'context_name', 'use_values',
+    'cache_rows', 'row_version_field', 'row_cache_alias', 'row_cache_timeout'
+)
 
 
 _table_registry = {}
 
+# Resolved cell template names, keyed by (table class, column name, template directory)
+_template_name_cache = {}
+
+# Whether a template name resolves to the template shipped with this app, keyed by (engine, template name)
+_package_template_cache = {}
+
+TEMPLATES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
 
 def get_tables():
     """
@@ -23,17 +38,147 @@ def get_tables():
     return _table_registry
 
 
+def get_column_template_name(table_class, column):
+    """
+    Returns the name of the template used to render the cells of a column. Checking whether an override template exists
+    requires a loader lookup, so the outcome is remembered per table class, column and template directory.
+    """
+
+    if column.template is not None:
+        return column.template
+
+    template_directory = 'bo_resellerarea/tables/{}'.format(table_class._meta.context_name)
+
+    # In case the template directory is defined in the table we use that
+    if table_class._meta.template_directory:
+        template_directory = table_class._meta.template_directory
+
+    key = (table_class, column.name, template_directory)
+
+    try:
+        return _template_name_cache[key]
+
+    except KeyError:
+        pass
+
+    template_name = '{}/{}.html'.format(template_directory, column.name)
+
+    if column.template_name:
+        template_name = '{}/{}'.format(template_directory, column.template_name)
+
+    try:
+        # Check if the template exists
+        get_template(template_name)
+
+    except TemplateDoesNotExist:
+        template_name = column.default_template
+
+    _template_name_cache[key] = template_name
+
+    return template_name
+
+
+def get_template_path(engine, template_name):
+    """
+    Returns the file the engine loads a template from, or None when a loader can't tell where its templates come from.
+    """
+
+    loaders = list(engine.template_loaders)
+
+    while loaders:
+        loader = loaders.pop(0)
+
+        if hasattr(loader, 'loaders'):
+            # Cached loader, look through the loaders it wraps in order
+            loaders[:0] = loader.loaders
+            continue
+
+        try:
+            source, path = loader.load_template_source(template_name)
+
+        except TemplateDoesNotExist:
+            continue
+
+        except NotImplementedError:
+            return None
+
+        return path
+
+    return None
+
+
+def is_package_template(engine, template_name):
+    """
+    Returns whether the engine loads the template from this app, rather than from an override elsewhere (e.g. in one
+    of the `DIRS` of the project). The outcome is remembered per engine and template name.
+    """
+
+    key = (engine, template_name)
+
+    try:
+        return _package_template_cache[key]
+
+    except KeyError:
+        pass
+
+    path = get_template_path(engine, template_name)
+    package_path = os.path.join(TEMPLATES_DIRECTORY, *template_name.split('/'))
+
+    _package_template_cache[key] = result = (
+        path is not None and os.path.normcase(os.path.abspath(path)) == os.path.normcase(package_path)
+    )
+
+    return result
+
+
+def clear_template_name_cache():
+    """
+    Forgets all resolved cell template names, and where templates are loaded from.
+    """
+    _template_name_cache.clear()
+    _package_template_cache.clear()
+
+
+def warm_template_name_cache(table_classes=None):
+    """
+    Resolves the cell template names of all columns up front, so the first request does not pay for the template
+    lookups. Call this from `AppConfig.ready` once the table classes are imported. Defaults to all registered tables.
+    """
+
+    if table_classes is None:
+        table_classes = get_tables().values()
+
+    for table_class in table_classes:
+        for name, column in table_class._meta.columns:
+            get_column_template_name(table_class, column)
+
+
 class Options(object):
 
     def __init__(self, meta):
         self.columns = []
+        self.columns_by_name = {}
+        self.order_by_columns = {}
+        self.always_visible_columns = ()
         self.meta = meta
 
         self.empty_message = _('No results matching your current filters')
         self.template_directory = None
         self.default_columns = None
+        self.default_order_by = None
         self.context_name = None
 
+        # Whether rows can be fetched as dictionaries with `values()` instead of model instances. Only enable it when
+        # neither the column templates nor the page template use anything but the fields of the columns.
+        self.use_values = False
+
+        # Caches the rendered rows, keyed by primary key and version field (e.g. "updated_at", required), see
+        # `TableRenderer`
+        self.cache_rows = False
+        self.row_version_field = None
+        self.row_cache_alias = 'default'
+        self.row_cache_timeout = None
+
     def contribute_to_class(self, cls, name):
 
         cls._meta = self
@@ -56,6 +201,34 @@ class Options(object):
                 elif hasattr(self.meta, attr_name):
                     setattr(self, attr_name, getattr(self.meta, attr_name))
 
+    def set_columns(self, columns):
+        """
+        Sets the (name, column) pairs of the table and builds the lookups derived from them, so resolving a column or a
+        sort order does not require a scan over the columns.
+        """
+
+        self.columns = columns
+        self.columns_by_name = dict(columns)
+
+        # Maps the sort values a user can pick ("name" and "-name") to the database ordering of sortable columns
+        self.order_by_columns = {}
+
+        for name, column in columns:
+            if column.sortable:
+                self.order_by_columns[name] = column.order_by_column or name
+                self.order_by_columns['-{}'.format(name)] = '-{}'.format(column.order_by_column or name)
+
+        self.always_visible_columns = tuple(name for name, column in columns if column.is_always_visible)
+
+    def get_visible_columns(self, names):
+        """
+        Returns the columns shown for the given column names, always visible columns included.
+        """
+
+        names = set(names or ())
+
+        return tuple(column for name, column in self.columns if name in names or column.is_always_visible)
+
 
 class TableBase(type):
 
@@ -98,7 +271,11 @@ class TableBase(type):
 
         Options(meta).contribute_to_class(new_class, '_meta')
 
-        new_class._meta.columns = sorted(declared_columns.items(), key=lambda item: item[1].creation_counter)
+        if new_class._meta.cache_rows and not new_class._meta.row_version_field:
+            # Keyed on the primary key alone, edited rows would show their cached output until it expires
+            raise ImproperlyConfigured('{} caches its rows, which requires a row_version_field.'.format(name))
+
+        new_class._meta.set_columns(sorted(declared_columns.items(), key=lambda item: item[1].creation_counter))
 
         # Add the class to the registry so we can connect models and table classes
         if hasattr(meta, 'model'):
@@ -107,9 +284,7 @@ class TableBase(type):
         return new_class
 
     def __getitem__(self, item):
-        for name, column in self._meta.columns:
-            if name == item:
-                return column
+        return self._meta.columns_by_name.get(item)
 
 
 class Table(six.with_metaclass(TableBase)):
@@ -118,35 +293,75 @@ class Table(six.with_metaclass(TableBase)):
         self.visible_columns = visible_columns
         self.rows = rows
 
+        # Values of columns with a batch callback, per column name keyed by the id of the row
+        self._batch_values = {}
+
     def __iter__(self):
         for context in self.rows:
             yield Row(context, self)
 
-    @property
+    @cached_property
     def columns(self):
         """
-        Returns all visible columns.
+        Returns all visible columns. The columns are resolved once per table, as every row and the header iterate them.
+        """
+
+        return self._meta.get_visible_columns(self.visible_columns)
+
+    def resolve_batch_values(self, columns=None, rows=None):
+        """
+        Calls the batch callbacks of the (visible) columns once with all rows of the table, or the given rows of it, and
+        keeps the values.
         """
 
-        for name, column in self._meta.columns:
+        columns = [column for column in columns or self.columns if column.get_values_callback]
+
+        if not columns:
+            return
 
-            if name not in self.visible_columns and not column.is_always_visible:
-                continue
+        if rows is None:
+            # Keep the rows, the values are looked up by the identity of the row objects
+            self.rows = rows = list(self.rows)
 
-            yield column
+        for column in columns:
+            if column.name not in self._batch_values:
+                values = column.get_values(rows, column.name)
+
+                self._batch_values[column.name] = dict((id(row), value) for row, value in zip(rows, values))
+
+    def get_value(self, context, column):
+        """
+        Returns the value of a column for a row. Columns with a batch callback are resolved for all rows of the table at
+        once, the first time one of their values is asked for.
+        """
+
+        if not column.get_values_callback:
+            return column.get_value(context, column.name)
+
+        self.resolve_batch_values(columns=[column])
+
+        try:
+            return self._batch_values[column.name][id(context)]
+
+        except KeyError:
+            # Not one of the rows of this table
+            return column.get_value(context, column.name)
 
     @property
     def context_name(self):
         return self._meta.context_name
 
+    @property
+    def empty_message(self):
+        return self._meta.empty_message
+
     @property
     def columns_count(self):
         """
-        Gets count of visible columns in table(and wraps logic required to get
-        it from generator)
+        Gets count of visible columns in table
         """
 
-        return len(list(self.columns))
+        return len(self.columns)
 
 
 class Row(object):
@@ -168,46 +383,32 @@ class Cell(object):
         self.table = table
 
     def get_template_name(self):
-
-        if self.column.template is not None:
-            return self.column.template
-
-        template_directory = 'bo_resellerarea/tables/{}'.format(self.table._meta.context_name)
-
-        # In case the template directory is defined in the table we use that
-        if self.table._meta.template_directory:
-            template_directory = self.table._meta.template_directory
-
-        template_name = '{}/{}.html'.format(template_directory, self.column.name)
-
-        if self.column.template_name:
-            template_name = '{}/{}'.format(template_directory, self.column.template_name)
-
-        try:
-            # Check if the template exists
-            get_template(template_name)
-
-        except TemplateDoesNotExist:
-            return self.column.default_template
-
-        return template_name
+        return get_column_template_name(type(self.table), self.column)
 
     def render(self, context_data):
 
-        context_data = copy.copy(context_data)
-        context_data.update({
+        cell_data = {
             'object': self.context
-        })
+        }
 
         try:
-            context_data['value'] = self.column.get_value(self.context, self.column.name)
+            cell_data['value'] = self.table.get_value(self.context, self.column)
 
         except AttributeError:
             pass
 
         template_name = self.get_template_name()
 
-        return render_to_string(template_name, context_data)
+        if not isinstance(context_data, BaseContext):
+            cell_data = dict(context_data, **cell_data)
+
+            return render_to_string(template_name, cell_data)
+
+        # Render on top of the given context, rather than on a copy of it
+        engine = context_data.template.engine if context_data.template is not None else Engine.get_default()
+
+        with context_data.push(**cell_data):
+            return engine.get_template(template_name).render(context_data)
 
 
 class DetailTableRow(object):
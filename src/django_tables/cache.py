@@ -0,0 +1,97 @@
+from __future__ import unicode_literals, absolute_import
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.encoding import force_bytes
+
+
+# Cached in place of a configuration when a user did not configure a table, so defaults don't require a query either
+NOT_CONFIGURED = 'not-configured'
+
+
+def get_configuration_cache():
+    """
+    Returns the cache holding table configurations, or None when caching them is disabled. Configurations are cached
+    when the `DJANGO_TABLES_CONFIGURATION_CACHE` setting names one of the configured caches.
+    """
+
+    alias = getattr(settings, 'DJANGO_TABLES_CONFIGURATION_CACHE', None)
+
+    if alias is None:
+        return None
+
+    return caches[alias]
+
+
+def get_configuration_cache_key(user_id, name):
+    return 'django_tables:configuration:{}:{}'.format(user_id, hashlib.md5(force_bytes(name)).hexdigest())
+
+
+def get_cached_configuration(user_id, name):
+    """
+    Returns the cached table configuration of a user, `NOT_CONFIGURED` when the user did not store one or None when
+    nothing is cached.
+    """
+
+    cache = get_configuration_cache()
+
+    if cache is None:
+        return None
+
+    return cache.get(get_configuration_cache_key(user_id, name))
+
+
+def set_cached_configuration(user_id, name, value, replace=True):
+    """
+    Caches the value for the configuration of a user. Values read from the database are cached with `replace=False`,
+    so they don't replace a configuration written through by a concurrent save after they were read.
+    """
+
+    cache = get_configuration_cache()
+
+    if cache is None:
+        return
+
+    key = get_configuration_cache_key(user_id, name)
+    timeout = getattr(settings, 'DJANGO_TABLES_CONFIGURATION_CACHE_TIMEOUT', None)
+
+    store = cache.set if replace else cache.add
+
+    if timeout is None:
+        store(key, value)
+
+    else:
+        store(key, value, timeout)
+
+
+def cache_configuration(table_configuration, replace=True):
+    set_cached_configuration(
+        table_configuration.user_id, table_configuration.name, table_configuration, replace=replace
+    )
+
+
+def cache_missing_configuration(user_id, name):
+    set_cached_configuration(user_id, name, NOT_CONFIGURED, replace=False)
+
+
+def delete_cached_configuration(user_id, name):
+
+    cache = get_configuration_cache()
+
+    if cache is None:
+        return
+
+    cache.delete(get_configuration_cache_key(user_id, name))
+
+
+def update_cached_configuration(sender, instance, **kwargs):
+    """
+    Writes saved configurations through to the cache. Note that `QuerySet.update` bypasses this.
+    """
+    cache_configuration(instance)
+
+
+def remove_cached_configuration(sender, instance, **kwargs):
+    delete_cached_configuration(instance.user_id, instance.name)
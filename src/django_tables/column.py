@@ -1,5 +1,101 @@
 from __future__ import unicode_literals, absolute_import
 
+from operator import attrgetter, methodcaller
+
+from django.template.defaultfilters import linebreaksbr, yesno
+from django.templatetags.l10n import localize
+from django.utils.html import conditional_escape, strip_spaces_between_tags
+from django.utils.safestring import mark_safe
+
+
+# The column templates end with a newline, which is part of their output
+NONE_OUTPUT = mark_safe('None\n')
+EMPTY_OUTPUT = mark_safe('\n')
+
+
+def format_default(value):
+    """
+    Python equivalent of `django_tables/columns/default.html`. Note that `linebreaksbr` turns `None` into the string
+    "None" before `default_if_none` is applied.
+    """
+
+    if value is None:
+        return NONE_OUTPUT
+
+    if value == '':
+        return EMPTY_OUTPUT
+
+    return mark_safe(linebreaksbr(value, autoescape=True) + '\n')
+
+
+def format_text(value):
+    """
+    Python equivalent of `django_tables/columns/text.html`.
+    """
+
+    if value is None:
+        return NONE_OUTPUT
+
+    if value == '':
+        return EMPTY_OUTPUT
+
+    return mark_safe(strip_spaces_between_tags(linebreaksbr(value, autoescape=True).strip()) + '\n')
+
+
+def format_date(value):
+    """
+    Python equivalent of `django_tables/columns/date.html`.
+    """
+
+    if value is None:
+        return NONE_OUTPUT
+
+    return mark_safe(conditional_escape(localize(value)) + '\n')
+
+
+def format_boolean(value):
+    """
+    Python equivalent of `django_tables/columns/boolean.html`.
+    """
+    return mark_safe(conditional_escape(yesno(value)) + '\n')
+
+
+def compile_value_getter(row_class, name):
+    """
+    Returns a function reading the value `name` from rows of the given class: the `get_<name>_display` method when the
+    class has one, otherwise the attribute or, for dictionaries without such attribute, the key. Errors reading the
+    attribute are silenced, which also covers optional OneToOne relations that don't exist.
+    """
+
+    verbose_value_method = 'get_{}_display'.format(name)
+
+    if hasattr(row_class, verbose_value_method):
+        return methodcaller(verbose_value_method)
+
+    if issubclass(row_class, dict) and not hasattr(row_class, name):
+        return lambda row: row.get(name)
+
+    get_attribute = attrgetter(name)
+
+    def get_value(row):
+        try:
+            return get_attribute(row)
+
+        except Exception:
+            if isinstance(row, dict):
+                return row.get(name)
+
+    return get_value
+
+
+# Formatters producing the exact output of the built-in column templates, keyed by template name
+TEMPLATE_FORMATTERS = {
+    'django_tables/columns/default.html': format_default,
+    'django_tables/columns/text.html': format_text,
+    'django_tables/columns/date.html': format_date,
+    'django_tables/columns/boolean.html': format_boolean,
+}
+
 
 class Column(object):
 
@@ -8,7 +104,8 @@ class Column(object):
     name = None
 
     def __init__(self, label=None, template=None, sortable=False, order_by_column=None, get_value_callback=None,
-                 is_always_visible=False, template_name=None):
+                 is_always_visible=False, template_name=None, accessor=None, select_related=None,
+                 prefetch_related=None, fields=None, get_values_callback=None):
 
         # Increase the creation counter, and save our local copy, this is used
         # to keep track of the column order
@@ -23,6 +120,23 @@ class Column(object):
         self.is_always_visible = is_always_visible
         self.template_name = template_name
 
+        # Dotted path to the value (e.g. "company.name"), defaults to the column name
+        self.accessor = accessor
+
+        # Relations to fetch along with the rows, by default inferred from the accessor
+        self.select_related = select_related
+        self.prefetch_related = prefetch_related
+
+        # Model fields the column depends on (e.g. ["first_name", "last_name"]), by default the accessor or name
+        self.fields = fields
+
+        # Called with all rows of a page and the column name, returns the values of those rows in the same order. This
+        # allows computed columns to use a single query per page instead of one per row.
+        self.get_values_callback = get_values_callback
+
+        # Functions reading the value, keyed by (row class, name)
+        self._value_getters = {}
+
     def set_column_name(self, name):
 
         self.name = name
@@ -31,28 +145,96 @@ class Column(object):
             self.label = name[0].upper() + name[1:].replace('_', ' ')
 
         if self.order_by_column is None and self.sortable:
-            self.order_by_column = self.name
+            self.order_by_column = self.get_lookup()
+
+    def get_lookup(self):
+        """
+        Returns the value of the column in lookup notation (e.g. "company__name" for "company.name").
+        """
+        return self.accessor.replace('.', '__') if self.accessor else self.name
+
+    def get_relation_path(self):
+        """
+        Returns the relation traversed by the accessor in lookup notation (e.g. "company__owner" for
+        "company.owner.name"), or None when the value is read from the row itself.
+        """
+
+        if not self.accessor or '.' not in self.accessor:
+            return None
+
+        return self.accessor.rsplit('.', 1)[0].replace('.', '__')
+
+    def get_formatter(self, template_name):
+        """
+        Returns a function rendering a value exactly like the given template does, or None when the template has to be
+        rendered. Only the built-in column templates have a formatter, so columns with their own template always use
+        the template engine. The renderer only asks for it when the template is loaded from this app, not an override.
+        """
+        return TEMPLATE_FORMATTERS.get(template_name)
 
     def get_value(self, context, name):
 
         if self.get_value_callback:
             return self.get_value_callback(context, name)
 
-        verbose_value_method = 'get_{}_display'.format(name)
+        if self.get_values_callback:
+            return self.get_values([context], name)[0]
+
+        if self.accessor:
+            if isinstance(context, dict):
+                # Rows fetched with `values()` hold related values by lookup (e.g. "company__name")
+                return context.get(self.get_lookup())
+
+            path, _, name = self.accessor.rpartition('.')
+
+            if path:
+                context = self.get_related(context, path)
+
+                if context is None:
+                    return None
+
+        try:
+            get_value = self._value_getters[type(context), name]
+
+        except KeyError:
+            # Decide how to read the value once per type of row, rather than probing every row
+            get_value = self._value_getters[type(context), name] = compile_value_getter(type(context), name)
+
+        return get_value(context)
+
+    def get_values(self, contexts, name):
+        """
+        Returns the values of the column for a list of rows, in the same order.
+        """
 
-        if hasattr(context, verbose_value_method):
-            return getattr(context, verbose_value_method)()
+        if self.get_values_callback:
+            return list(self.get_values_callback(contexts, name))
+
+        return [self.get_value(context, name) for context in contexts]
+
+    def get_related(self, context, path):
+        """
+        Follows a dotted path from the row, returns None when a relation along the path is missing.
+        """
 
         try:
-            return getattr(context, name)
+            return attrgetter(path)(context)
 
         except Exception:
-            # Silently handle errors. Also fixes an issue with optional OneToOne relations where the relations does
-            # not exist.
             pass
 
-        if isinstance(context, dict):
-            return context.get(name)
+        for attribute in path.split('.'):
+            try:
+                context = context.get(attribute) if isinstance(context, dict) else getattr(context, attribute)
+
+            except Exception:
+                # Silently handle missing relations, like the value itself
+                return None
+
+            if context is None:
+                return None
+
+        return context
 
 
 class DateColumn(Column):
@@ -68,3 +250,20 @@ class BooleanColumn(Column):
 class TextColumn(Column):
 
     default_template = 'django_tables/columns/text.html'
+
+
+class ExpressionColumn(Column):
+
+    """
+    Column computed by the database from a query expression (e.g. `Concat`, `Case` or `Count`). The rows are annotated
+    with the expression, named after the column, when the column is visible or sorted on; sorting happens in SQL.
+    """
+
+    def __init__(self, expression, sortable=True, **kwargs):
+
+        self.expression = expression
+
+        # The value is added by the annotation, it does not depend on model fields
+        kwargs.setdefault('fields', ())
+
+        super(ExpressionColumn, self).__init__(sortable=sortable, **kwargs)
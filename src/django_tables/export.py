@@ -0,0 +1,95 @@
+from __future__ import unicode_literals, absolute_import
+
+import csv
+import datetime
+import decimal
+import json
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.encoding import force_text
+import six
+
+
+# Values which are exported to JSON as they are
+JSON_TYPES = six.string_types + six.integer_types + (
+    float, bool, decimal.Decimal, datetime.date, datetime.time, datetime.timedelta, uuid.UUID
+)
+
+
+class Echo(object):
+    """
+    File-like object returning what is written to it, which lets the csv module produce lines for a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_csv_value(value):
+
+    value = '' if value is None else force_text(value)
+
+    if six.PY2:
+        value = value.encode('utf-8')
+
+    return value
+
+
+def get_json_value(value):
+
+    if value is None or isinstance(value, JSON_TYPES):
+        return value
+
+    return force_text(value)
+
+
+def export_csv(columns, rows):
+    """
+    Yields the lines of a CSV file with the labels of the columns as header and a line per row of values.
+    """
+
+    writer = csv.writer(Echo())
+
+    yield writer.writerow([get_csv_value(column.label) for column in columns])
+
+    for values in rows:
+        yield writer.writerow([get_csv_value(value) for value in values])
+
+
+def export_ndjson(columns, rows):
+    """
+    Yields a JSON object per row of values, mapping the column names to the values, separated by newlines.
+    """
+
+    names = [column.name for column in columns]
+
+    for values in rows:
+        data = dict((name, get_json_value(value)) for name, value in zip(names, values))
+
+        yield json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n'
+
+
+def export_json_page(data, rows):
+    """
+    Yields a JSON object holding the given data (which must not be empty) and a "rows" array with the rows of values,
+    serializing one row at a time.
+    """
+
+    yield json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))[:-1] + ',"rows":['
+
+    separator = ''
+
+    for values in rows:
+        yield separator + json.dumps([get_json_value(value) for value in values], cls=DjangoJSONEncoder,
+                                     separators=(',', ':'))
+        separator = ','
+
+    yield ']}'
+
+
+# Export formats, mapping the format to its content type, file extension and writer
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv', export_csv),
+    'ndjson': ('application/x-ndjson; charset=utf-8', 'ndjson', export_ndjson),
+}
@@ -0,0 +1,196 @@
+from __future__ import unicode_literals, absolute_import
+
+import logging
+import tempfile
+import threading
+import traceback
+
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import close_old_connections, connections
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone, translation
+from django.utils.encoding import force_bytes
+from django.utils.module_loading import import_string
+import six
+
+from django_tables.export import EXPORT_FORMATS
+from django_tables.models import ExportJob
+
+
+logger = logging.getLogger(__name__)
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_thread_pool(name, max_workers):
+    """
+    Returns the thread pool with the given name, running tasks in the web process. Pools are created once per process.
+    """
+
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=max_workers)
+
+    return _executors[name]
+
+
+def get_default_executor():
+    """
+    Returns the thread pool running export jobs in the web process. Its size is set by the
+    `DJANGO_TABLES_EXPORT_WORKERS` setting.
+    """
+    return get_thread_pool('export', getattr(settings, 'DJANGO_TABLES_EXPORT_WORKERS', 2))
+
+
+def get_refresh_executor():
+    """
+    Returns the thread pool refreshing stale cached pages, see `ConfigurableTableView.page_cache_alias`. Its size is set
+    by the `DJANGO_TABLES_REFRESH_WORKERS` setting.
+    """
+    return get_thread_pool('refresh', getattr(settings, 'DJANGO_TABLES_REFRESH_WORKERS', 2))
+
+
+def get_query_executor():
+    """
+    Returns the thread pool running queries of a request at the same time, see `run_with_own_connection`. Its size is
+    set by the `DJANGO_TABLES_QUERY_WORKERS` setting, which bounds the number of extra database connections.
+    """
+    return get_thread_pool('query', getattr(settings, 'DJANGO_TABLES_QUERY_WORKERS', 4))
+
+
+def run_with_own_connection(function, *args, **kwargs):
+    """
+    Calls the function on a worker thread, which queries the database over its own connections. Like around a request,
+    those are closed before and after the call when they are unusable or older than `CONN_MAX_AGE`, and are kept for
+    the next call on the thread otherwise. The worker can't see changes made in a transaction of the request that was
+    not committed yet.
+    """
+
+    close_old_connections()
+
+    try:
+        return function(*args, **kwargs)
+
+    finally:
+        close_old_connections()
+
+
+def get_export_executor():
+    """
+    Returns the executor running export jobs. The `DJANGO_TABLES_EXPORT_EXECUTOR` setting may name (by dotted path) an
+    object with a `submit(fn, *args, **kwargs)` method, e.g. to hand jobs to a task queue instead.
+    """
+
+    executor = getattr(settings, 'DJANGO_TABLES_EXPORT_EXECUTOR', None)
+
+    if executor is None:
+        return get_default_executor()
+
+    if isinstance(executor, six.string_types):
+        executor = import_string(executor)
+
+    return executor
+
+
+def update_export_job(job, **fields):
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+    ExportJob.objects.filter(pk=job.pk).update(**fields)
+
+
+def get_export_request(job):
+    """
+    Returns a request like the one which started the job: a GET request of the user holding the same query string.
+    """
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(job.parameters.get('query_string', ''))
+    request.user = get_user_model()._default_manager.get(pk=job.user_id)
+
+    return request
+
+
+def run_export_job(job_id):
+    """
+    Runs the export job with the given primary key: sets up the view which started it (see
+    `ConfigurableTableView.from_export_job`) and writes the rows of the table to a file stored with the job, recording
+    the progress per chunk of rows. As the job is given by its primary key only, executors may hand it to another
+    process.
+
+    The job row has to be committed before the job runs. With `ATOMIC_REQUESTS`, it is only committed once the
+    request finishes, while a thread pool may start the job right away; exclude the view from it with
+    `non_atomic_requests`, or use an executor which runs jobs after the transaction commits.
+    """
+
+    try:
+        job = ExportJob.objects.get(pk=job_id)
+
+    except ExportJob.DoesNotExist:
+        logger.error('Export job %s does not exist, was its transaction committed?', job_id)
+        connections.close_all()
+        return
+
+    try:
+        update_export_job(job, status=ExportJob.RUNNING)
+
+        # Labels and values are rendered in the language of the request which started the job
+        with translation.override(job.parameters.get('language') or settings.LANGUAGE_CODE):
+            export_to_file(job)
+
+        update_export_job(
+            job,
+            status=ExportJob.FINISHED,
+            file=job.file.name,
+            rows_exported=job.rows_exported,
+            finished_at=timezone.now()
+        )
+
+    except Exception:
+        logger.exception('Export of %s table failed', job.name)
+        update_export_job(job, status=ExportJob.FAILED, error=traceback.format_exc(), finished_at=timezone.now())
+
+    finally:
+        connections.close_all()
+
+
+def export_to_file(job):
+    """
+    Writes the rows of the table of the export job to a file stored with the job, recording the progress per chunk of
+    rows.
+    """
+
+    view = import_string(job.view).from_export_job(job=job, request=get_export_request(job))
+    content_type, extension, export = EXPORT_FORMATS[job.export_format]
+
+    table_class = view.get_table_class()
+    columns = view.get_visible_columns(table_class=table_class)
+    queryset = view.get_export_queryset()
+
+    update_export_job(job, rows_total=queryset.count() if hasattr(queryset, 'count') else len(queryset))
+
+    rows = view.get_export_rows(table_class=table_class, queryset=queryset)
+    progress_interval = view.export_chunk_size
+
+    def counted_rows():
+        for count, values in enumerate(rows, 1):
+            yield values
+
+            if count % progress_interval == 0:
+                update_export_job(job, rows_exported=count)
+
+            job.rows_exported = count
+
+    with tempfile.TemporaryFile() as output:
+
+        for line in export(columns, counted_rows()):
+            output.write(force_bytes(line))
+
+        output.seek(0)
+        job.file.save(view.get_export_filename(table_class=table_class, extension=extension), File(output),
+                      save=False)
@@ -1,14 +1,20 @@
 from __future__ import unicode_literals, absolute_import
 
-import copy
 import re
 
+from django.core.paginator import InvalidPage
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django.views.generic.edit import FormMixin
 from django.utils.functional import cached_property
+from django.utils.translation import ugettext as _
 
+from django_tables.cache import cache_configuration, cache_missing_configuration, get_cached_configuration
 from django_tables.forms import TableConfigurationForm
+from django_tables.jobs import get_query_executor
 from django_tables.models import TableConfiguration
-from django_tables.paginator import DiggPaginator
+from django_tables.paginator import CursorPaginator, DiggPaginator, ExactCount
+from django_tables.query import annotate_columns
 
 
 class TableMixin(object):
@@ -16,6 +22,7 @@ class TableMixin(object):
     table_name = None
     table_class = None
     table_default_columns = None
+    table_default_order_by = None
     table_configuration_form_class = TableConfigurationForm
 
     def get_table_class(self):
@@ -83,19 +90,67 @@ class TableMixin(object):
 
     def get_table_configuration(self, table_class):
         """
-        Returns the initialized table configuration model for this table.
+        Returns the table configuration model for this table and whether it is a new, unsaved default configuration.
+        Defaults are only stored once the user changes them. When a configuration cache is set up, it is read from the
+        cache before falling back to the database.
         """
 
-        table_configuration, created = TableConfiguration.objects.get_or_create(
-            user=self.request.user,
+        name = self.get_table_name_for_table_class(table_class=table_class)
+        user_id = self.request.user.pk
+        table_configuration = None
+
+        if user_id is not None:
+            table_configuration = get_cached_configuration(user_id=user_id, name=name)
+
+            if table_configuration is None:
+                try:
+                    table_configuration = TableConfiguration.objects.get(user_id=user_id, name=name)
+
+                except TableConfiguration.DoesNotExist:
+                    cache_missing_configuration(user_id=user_id, name=name)
+
+                else:
+                    cache_configuration(table_configuration, replace=False)
+
+        if not isinstance(table_configuration, TableConfiguration) or \
+                table_configuration.table_class != table_class.__name__:
+            return self.get_default_table_configuration(table_class=table_class), True
+
+        return table_configuration, False
+
+    def get_default_table_configuration(self, table_class):
+        """
+        Returns an unsaved table configuration holding the defaults for this table.
+        """
+
+        return TableConfiguration(
+            user_id=self.request.user.pk,
             name=self.get_table_name_for_table_class(table_class=table_class),
             table_class=table_class.__name__,
-            defaults={
-                'columns': self.get_default_columns(table_class=table_class)
-            }
+            columns=self.get_default_columns(table_class=table_class),
+            order_by=self.get_default_table_order_by(table_class=table_class)
         )
 
-        return table_configuration, created
+    def save_table_configuration(self, table_configuration, fields):
+        """
+        Stores the changed fields of a table configuration, default configurations are stored as a whole.
+        """
+
+        if table_configuration.pk is not None:
+            table_configuration.save(update_fields=fields)
+            return
+
+        try:
+            with transaction.atomic():
+                table_configuration.save()
+
+        except IntegrityError:
+            # The user already has a configuration with this name, stored concurrently or for another table class
+            table_configuration.pk = TableConfiguration.objects.get(
+                user_id=table_configuration.user_id,
+                name=table_configuration.name
+            ).pk
+            table_configuration.save()
 
     def get_default_columns(self, table_class):
 
@@ -104,11 +159,21 @@ class TableMixin(object):
         if self.table_default_columns:
             default_columns = self.table_default_columns
 
-        default_columns = copy.deepcopy(default_columns)
-        default_columns.extend([name for name, column in table_class._meta.columns if column.is_always_visible])
+        default_columns = list(default_columns or [])
+        default_columns.extend(table_class._meta.always_visible_columns)
 
         return default_columns
 
+    def get_default_table_order_by(self, table_class):
+        """
+        Returns the sorting (e.g. "name" or "-name") of a table which is not configured by the user.
+        """
+
+        if self.table_default_order_by:
+            return self.table_default_order_by
+
+        return table_class._meta.default_order_by
+
     def get_order_by(self):
 
         order_by = super(TableMixin, self).get_order_by()
@@ -130,18 +195,8 @@ class TableMixin(object):
         if not order_by:
             return
 
-        # Keep track of ascending or descending order
-        desc = order_by.startswith('-')
-
-        if desc:
-            order_by = order_by[1:]
-
-        order_by = table_class[order_by].order_by_column
-
-        if desc:
-            order_by = '-{}'.format(order_by)
-
-        return order_by
+        # Convert the configured column (keeping track of ascending or descending order) to its order_by_column
+        return table_class._meta.order_by_columns.get(order_by)
 
 
 class FilterMixin(FormMixin):
@@ -256,18 +311,19 @@ class OrderByMixin(object):
 
     def get_ordered(self, object_list, order_by):
 
-        direction = self.get_direction(order_by)
-        column_name = self.get_field_name(order_by)
+        table_class = self.get_table_class()
+
+        # Sorting on a computed column requires its annotation, which is only added for visible columns
+        column = table_class._meta.columns_by_name.get(self.get_field_name(order_by))
 
-        # Check if column is a part of table configuration
-        column = self.get_table_class()[column_name]
+        # Convert table configuration field name to order_by_column, only sortable columns of the table are known
+        order_by = table_class._meta.order_by_columns.get(order_by)
 
-        # Is column sortable?
-        if not column or not column.sortable:
+        if not order_by:
             return object_list
 
-        # Convert table configuration field name to order_by_column if defined
-        order_by = '{}{}'.format(direction, column.order_by_column or column_name)
+        if column is not None and hasattr(object_list, 'query'):
+            object_list = annotate_columns(queryset=object_list, columns=[column])
 
         return object_list.order_by(order_by)
 
@@ -276,9 +332,54 @@ class PaginationMixin(object):
 
     paginator_class = DiggPaginator
 
+    # How the paginator counts the rows, see `ExactCount`, `CachedCount`, `EstimatedCount` and `HasNextCount`
+    count_strategy = None
+
+    # Run the COUNT query on a worker thread while the rows of the page are fetched, see `jobs.get_query_executor`.
+    # Each worker keeps its own connection for `CONN_MAX_AGE`, like the request threads do
+    count_in_parallel = False
+
+    # Seek to pages with a cursor instead of an offset, keeping deep pages as fast as the first one
+    paginate_by_cursor = False
+    cursor_paginator_class = CursorPaginator
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+
+        if not self.paginate_by_cursor:
+            return super(PaginationMixin, self).paginate_queryset(queryset, page_size)
+
+        paginator = self.get_cursor_paginator(queryset, page_size)
+
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+
+        except InvalidPage as e:
+            raise Http404(_('Invalid cursor: %(message)s') % {
+                'message': str(e)
+            })
+
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_cursor_paginator(self, queryset, per_page):
+        """
+        Return an instance of the cursor paginator for this view. The queryset is already ordered by the requested
+        sort column, see `OrderByMixin`.
+        """
+        return self.cursor_paginator_class(queryset, per_page)
+
     def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True):
         """
         Return an instance of the paginator for this view.
         """
+        count_strategy = self.get_count_strategy()
+
         return self.paginator_class(queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page,
-                                    body=10, padding=2, margin=2, tail=3)
+                                    body=10, padding=2, margin=2, tail=3, count_strategy=count_strategy,
+                                    align_left=count_strategy.align_left, count_executor=self.get_count_executor())
+
+    def get_count_executor(self):
+        return get_query_executor() if self.count_in_parallel else None
+
+    def get_count_strategy(self):
+        return self.count_strategy or ExactCount()
@@ -1,6 +1,7 @@
 from __future__ import unicode_literals, absolute_import
 
 from django.conf import settings
+from django.core.urlresolvers import reverse
 from django.db import models
 from jsonfield import JSONField
 
@@ -21,3 +22,48 @@ class TableConfiguration(models.Model):
 
     def __unicode__(self):
         return 'Configuration for {} table'.format(self.name)
+
+
+class ExportJob(models.Model):
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FINISHED, 'Finished'),
+        (FAILED, 'Failed'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL)
+    name = models.CharField(max_length=255)
+    export_format = models.CharField(max_length=32)
+    view = models.CharField(max_length=255, blank=True)
+    parameters = JSONField(default='{}')
+    status = models.CharField(max_length=32, choices=STATUS_CHOICES, default=PENDING)
+    rows_exported = models.PositiveIntegerField(default=0)
+    rows_total = models.PositiveIntegerField(null=True)
+    file = models.FileField(upload_to='django_tables/exports', null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta(object):
+        db_table = 'table_export_job'
+        app_label = 'django_tables'
+
+    def __unicode__(self):
+        return 'Export of {} table'.format(self.name)
+
+    @property
+    def is_done(self):
+        return self.status in (self.FINISHED, self.FAILED)
+
+    def get_status_url(self):
+        return reverse('django_tables_export_job', kwargs={'pk': self.pk})
+
+    def get_download_url(self):
+        return reverse('django_tables_export_job_download', kwargs={'pk': self.pk})
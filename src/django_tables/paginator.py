@@ -1,6 +1,21 @@
+import base64
+import datetime
+import decimal
+import hashlib
+import json
 import math
 
-from django.core.paginator import Paginator, Page, InvalidPage
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.paginator import Paginator, Page, InvalidPage, PageNotAnInteger, EmptyPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.db.models.sql.datastructures import EmptyResultSet
+from django.utils.dateparse import parse_datetime, parse_time
+from django.utils.encoding import force_bytes, force_text
+
+from django_tables.jobs import run_with_own_connection
 
 
 class ExPaginatorMixin(object):
@@ -264,7 +279,166 @@ class DiggPaginatorMixin(object):
         return page
 
 
-class ExPaginator(ExPaginatorMixin, Paginator):
+class ExactCount(object):
+    """Counts all rows, like Django's paginator does."""
+
+    # Whether the paginator should skip the trailing range of pages
+    align_left = False
+
+    # Whether the count is derived from the rows fetched for the page
+    counts_from_rows = False
+
+    def get_count(self, object_list):
+        try:
+            return object_list.count()
+        except (AttributeError, TypeError):
+            return len(object_list)
+
+
+class CachedCount(ExactCount):
+    """Counts all rows and caches the count per query for ``timeout``
+    seconds. The key is derived from the SQL of the query, so it differs
+    per table and per set of filters.
+    """
+
+    def __init__(self, timeout=60, cache_alias='default', key_prefix='django_tables:count'):
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+
+    def get_cache_key(self, object_list):
+        sql, params = object_list.query.sql_with_params()
+        query_hash = hashlib.md5(force_bytes('{}{!r}'.format(sql, params))).hexdigest()
+
+        return '{}:{}:{}'.format(self.key_prefix, object_list.model._meta.db_table, query_hash)
+
+    def get_count(self, object_list):
+
+        try:
+            key = self.get_cache_key(object_list)
+        except (AttributeError, EmptyResultSet):
+            return super(CachedCount, self).get_count(object_list)
+
+        cache = caches[self.cache_alias]
+        count = cache.get(key)
+
+        if count is None:
+            count = super(CachedCount, self).get_count(object_list)
+            cache.set(key, count, self.timeout)
+
+        return count
+
+
+class EstimatedCount(ExactCount):
+    """Uses ``estimate(object_list)`` for the count, e.g. the row estimate
+    kept by the database for the table. The rows are counted when it
+    returns None.
+    """
+
+    def __init__(self, estimate):
+        self.estimate = estimate
+
+    def get_count(self, object_list):
+        count = self.estimate(object_list)
+
+        if count is None:
+            return super(EstimatedCount, self).get_count(object_list)
+
+        return count
+
+
+class HasNextCount(ExactCount):
+    """Doesn't count the rows, but fetches one row beyond the page to know
+    whether there is a next page. The paginator then shows the pages up to
+    the next one, in ``align_left`` mode.
+    """
+
+    align_left = True
+    counts_from_rows = True
+
+
+class CountStrategyPaginatorMixin(object):
+    """Fetches the rows of a page before counting, and asks the count
+    strategy for the count only when the rows don't tell. Pages holding
+    fewer rows than the page size are the last page, so the count follows
+    from the rows; in particular a first page which is not full never
+    requires a COUNT query.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.count_strategy = kwargs.pop('count_strategy', None) or ExactCount()
+        self.count_executor = kwargs.pop('count_executor', None)
+        super(CountStrategyPaginatorMixin, self).__init__(*args, **kwargs)
+
+    def start_count(self):
+        """
+        Starts counting on the count executor, if any, returning the future count. The count runs over the database
+        connection of the worker thread, at the same time as the rows are fetched; see `jobs.run_with_own_connection`
+        for how long that connection is kept.
+        """
+
+        if self.count_executor is None or self.count_strategy.counts_from_rows:
+            return None
+
+        return self.count_executor.submit(run_with_own_connection, self.count_strategy.get_count, self.object_list)
+
+    def get_count_result(self, count):
+        """
+        Returns the count the future started by `start_count` resolves to. A count still waiting for a worker (which
+        are shared by all requests) is cancelled and counted right away instead, as waiting would only add to the time
+        the rows took.
+        """
+
+        if count.cancel():
+            return self.count_strategy.get_count(self.object_list)
+
+        return count.result()
+
+    def _get_count(self):
+        if self._count is None:
+            self._count = self.count_strategy.get_count(self.object_list)
+        return self._count
+    count = property(_get_count)
+
+    def page(self, number):
+
+        if self._count is not None or self.orphans:
+            return super(CountStrategyPaginatorMixin, self).page(number)
+
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+
+        count = self.start_count()
+
+        # Fetch one more row to know whether there is another page
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+
+        if not rows and number > 1:
+            if count is not None:
+                self._count = self.get_count_result(count)
+
+            # Beyond the last page, the count determines what happens
+            return super(CountStrategyPaginatorMixin, self).page(number)
+
+        if len(rows) <= self.per_page or self.count_strategy.counts_from_rows:
+            self._count = bottom + len(rows)
+
+            if count is not None:
+                # The rows tell the count, no need to wait for it
+                count.cancel()
+
+        elif count is not None:
+            self._count = self.get_count_result(count)
+
+        return self._get_page(rows[:self.per_page], self.validate_number(number), self)
+
+
+class ExPaginator(ExPaginatorMixin, CountStrategyPaginatorMixin, Paginator):
     pass
 
 
@@ -278,3 +452,245 @@ class DiggPage(Page):
                             " ".join(map(str, self.leading_range)),
                             " ".join(map(str, self.main_range)),
                             " ".join(map(str, self.trailing_range))]))
+
+
+def encode_cursor_value(value):
+    """
+    Returns a JSON serializable version of a cursor value. `DjangoJSONEncoder` cuts datetimes and times down to
+    milliseconds, so those (and decimals) are tagged with their type and kept in full.
+    """
+
+    if isinstance(value, datetime.datetime):
+        return {'datetime': value.isoformat()}
+
+    if isinstance(value, datetime.time):
+        return {'time': value.isoformat()}
+
+    if isinstance(value, decimal.Decimal):
+        return {'decimal': str(value)}
+
+    return value
+
+
+def decode_cursor_value(value):
+    """
+    Returns the value encoded by `encode_cursor_value`, raises ValueError for values which can't be decoded.
+    """
+
+    if not isinstance(value, dict):
+        return value
+
+    if len(value) != 1:
+        raise ValueError('Unknown cursor value')
+
+    (kind, encoded), = value.items()
+
+    if kind == 'datetime':
+        decoded = parse_datetime(encoded)
+
+    elif kind == 'time':
+        decoded = parse_time(encoded)
+
+    elif kind == 'decimal':
+        try:
+            decoded = decimal.Decimal(encoded)
+        except decimal.InvalidOperation:
+            decoded = None
+
+    else:
+        decoded = None
+
+    if decoded is None:
+        raise ValueError('Invalid cursor value')
+
+    return decoded
+
+
+class CursorPaginator(object):
+    """Paginates a queryset by seeking past the last row of the previous
+    page, rather than skipping rows with an offset. The database can use an
+    index on the sort column to find a page, so deep pages are as fast as
+    the first one.
+
+    The queryset is ordered by its first ordering field (or the model's
+    default ordering) with the primary key as tiebreaker. Pages are
+    addressed by opaque cursors instead of page numbers; a cursor created
+    for another ordering starts at the first page.
+    """
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = self.get_ordering()
+
+    def get_ordering(self):
+        """
+        Returns the ordering (e.g. ["-name", "-pk"]) used to seek through the rows.
+        """
+
+        query = self.object_list.query
+        ordering = list(query.order_by)
+
+        if not ordering and query.default_ordering:
+            ordering = list(self.object_list.model._meta.ordering)
+
+        ordering = [field for field in ordering if hasattr(field, 'startswith')][:1]
+
+        if ordering and ordering[0].lstrip('-') == '?':
+            raise ImproperlyConfigured('Random ordering can not be paginated with a cursor.')
+
+        if not ordering or ordering[0].lstrip('-') in ('pk', self.object_list.model._meta.pk.name):
+            return ['-pk' if ordering and ordering[0].startswith('-') else 'pk']
+
+        # Sort rows with equal values by primary key, in the same direction
+        return [ordering[0], '-pk' if ordering[0].startswith('-') else 'pk']
+
+    def encode_cursor(self, direction, row):
+        values = [encode_cursor_value(self.get_row_value(row, field.lstrip('-'))) for field in self.ordering]
+        data = json.dumps([direction, self.ordering, values], cls=DjangoJSONEncoder, separators=(',', ':'))
+
+        return force_text(base64.urlsafe_b64encode(force_bytes(data)))
+
+    def decode_cursor(self, cursor):
+        """
+        Returns the direction and the values of the row the cursor points at, or (None, None) for cursors of another
+        ordering.
+        """
+
+        try:
+            direction, ordering, values = json.loads(force_text(base64.urlsafe_b64decode(force_bytes(cursor))))
+
+        except (TypeError, ValueError):
+            raise InvalidPage('That cursor is not valid')
+
+        if ordering != self.ordering or direction not in ('next', 'previous'):
+            return None, None
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidPage('That cursor is not valid')
+
+        try:
+            values = [decode_cursor_value(value) for value in values]
+
+        except (TypeError, ValueError):
+            raise InvalidPage('That cursor is not valid')
+
+        return direction, values
+
+    def get_row_value(self, row, field):
+
+        if isinstance(row, dict):
+            return row.get(field)
+
+        value = row
+
+        for attribute in field.split('__'):
+            value = getattr(value, attribute, None)
+
+        return value
+
+    def get_seek_filter(self, values, backwards):
+        """
+        Returns the filter selecting the rows after (or before, when seeking backwards) the given values.
+        """
+
+        field, descending = self.ordering[0].lstrip('-'), self.ordering[0].startswith('-')
+        lookup = 'lt' if descending != backwards else 'gt'
+
+        if len(self.ordering) == 1:
+            return Q(**{'pk__{}'.format(lookup): values[0]})
+
+        value, pk = values
+        pk_filter = {'pk__{}'.format(lookup): pk}
+
+        # Whether NULL values are sorted in the direction we are seeking, which depends on the database
+        nulls_largest = connections[self.object_list.db].features.nulls_order_largest
+        nulls_ahead = nulls_largest if lookup == 'gt' else not nulls_largest
+
+        if value is None:
+            seek_filter = Q(**dict(pk_filter, **{'{}__isnull'.format(field): True}))
+
+            if not nulls_ahead:
+                seek_filter |= Q(**{'{}__isnull'.format(field): False})
+
+            return seek_filter
+
+        seek_filter = Q(**{'{}__{}'.format(field, lookup): value}) | Q(**dict(pk_filter, **{field: value}))
+
+        if nulls_ahead:
+            seek_filter |= Q(**{'{}__isnull'.format(field): True})
+
+        return seek_filter
+
+    def page(self, cursor=None):
+        """
+        Returns the page the cursor points at, the first page when no cursor is given.
+        """
+
+        direction, values = self.decode_cursor(cursor) if cursor else (None, None)
+        backwards = direction == 'previous'
+
+        queryset = self.object_list.order_by(*self.ordering)
+
+        if values is not None:
+            try:
+                queryset = queryset.filter(self.get_seek_filter(values, backwards=backwards))
+
+            except (TypeError, ValueError, ValidationError):
+                # Values which don't fit the fields they are compared to
+                raise InvalidPage('That cursor is not valid')
+
+        if backwards:
+            queryset = queryset.reverse()
+
+        # Fetch one more row to know whether there is another page
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return CursorPage(
+            object_list=rows,
+            paginator=self,
+            next_cursor=self.encode_cursor('next', rows[-1]) if rows and has_next else None,
+            previous_cursor=self.encode_cursor('previous', rows[0]) if rows and has_previous else None
+        )
+
+
+class CursorPage(object):
+
+    # Cursor pages are not numbered
+    number = None
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<CursorPage>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
@@ -0,0 +1,314 @@
+from __future__ import unicode_literals, absolute_import
+
+from django.core.exceptions import FieldDoesNotExist
+
+from django_tables.base import get_column_template_name
+from django_tables.paginator import CursorPaginator
+
+
+def is_single_valued_path(model, path):
+    """
+    Returns whether a relation path (e.g. "company__owner") only follows foreign keys and one-to-one relations, so it
+    can be fetched with `select_related`. Returns None when the path is not a relation of the model.
+    """
+
+    single_valued = True
+
+    for name in path.split('__'):
+
+        try:
+            field = model._meta.get_field(name)
+
+        except FieldDoesNotExist:
+            return None
+
+        if not field.is_relation:
+            return None
+
+        if not (field.many_to_one or field.one_to_one) or field.related_model is None:
+            single_valued = False
+
+        if field.related_model is None:
+            break
+
+        model = field.related_model
+
+    return single_valued
+
+
+def get_related_lookups(model, columns):
+    """
+    Returns the `select_related` and `prefetch_related` lookups required to show the columns for rows of the given
+    model. Declared relations are used as is, relations traversed by accessors are inferred from the model, as are
+    foreign keys and one-to-one relations shown by a column themselves (e.g. `company = Column()`).
+    """
+
+    select_related = []
+    prefetch_related = []
+
+    def add(lookups, lookup):
+        if lookup not in lookups:
+            lookups.append(lookup)
+
+    for column in columns:
+
+        for lookup in column.select_related or ():
+            add(select_related, lookup)
+
+        for lookup in column.prefetch_related or ():
+            add(prefetch_related, lookup)
+
+        if column.select_related is not None or column.prefetch_related is not None:
+            continue
+
+        if is_single_valued_path(model, column.get_lookup()):
+            add(select_related, column.get_lookup())
+            continue
+
+        path = column.get_relation_path()
+
+        if path is None:
+            continue
+
+        single_valued = is_single_valued_path(model, path)
+
+        if single_valued:
+            add(select_related, path)
+
+        elif single_valued is not None:
+            add(prefetch_related, path)
+
+    return select_related, prefetch_related
+
+
+def get_column_fields(table_class, column):
+    """
+    Returns the model fields a column depends on, or None when they can't be known. That is the case for columns using
+    a callback or their own template, unless the column declares its fields.
+    """
+
+    if column.fields is not None:
+        return column.fields
+
+    if column.get_value_callback is not None or column.get_values_callback is not None:
+        return None
+
+    if get_column_template_name(table_class, column) != column.default_template:
+        return None
+
+    return [column.get_lookup()]
+
+
+def get_only_fields(model, fields, select_related=()):
+    """
+    Returns the arguments for `QuerySet.only` to load the given fields (in lookup notation), or None when one of them
+    is not a concrete field of the model. Fields of related models are only included when the relation is selected
+    along with the rows, otherwise the foreign key itself is loaded.
+
+    Deferring fields can't be combined with selecting reverse one-to-one relations, so None is returned in that case.
+    Relations which are loaded whole (e.g. shown by `company = Column()`) load all fields of the related model, even
+    when other fields list some fields of it.
+    """
+
+    only = []
+    whole_relations = []
+
+    def is_selected(path):
+        return any(lookup == path or lookup.startswith(path + '__') for lookup in select_related)
+
+    for lookup in select_related:
+
+        current_model = model
+
+        for name in lookup.split('__'):
+            field = current_model._meta.get_field(name)
+
+            if not field.concrete:
+                return None
+
+            current_model = field.related_model
+
+    for lookup in fields:
+
+        parts = lookup.split('__')
+        current_model = model
+
+        for index, name in enumerate(parts):
+
+            path = '__'.join(parts[:index + 1])
+
+            try:
+                field = current_model._meta.get_field(name)
+
+            except FieldDoesNotExist:
+                return None
+
+            if not field.is_relation:
+
+                if not field.concrete:
+                    return None
+
+                only.append(path)
+                break
+
+            if not field.concrete:
+                # Reverse relations are loaded by a separate query, no local field required
+                break
+
+            if field.many_to_many:
+                break
+
+            if index == len(parts) - 1 or not is_selected(path):
+                only.append(path)
+
+                if index == len(parts) - 1:
+                    whole_relations.append(path)
+
+                break
+
+            current_model = field.related_model
+
+    return [
+        lookup for lookup in only
+        if not any(lookup.startswith(path + '__') for path in whole_relations)
+    ]
+
+
+def get_value_lookup(model, column):
+    """
+    Returns the lookup (e.g. "company__name") to fetch the value of a column with `values()`, or None when the value
+    can't be read from the database as is. That is the case for callbacks, relations, fields with choices (which show
+    their display value) and attributes which are not a concrete field.
+    """
+
+    if column.get_value_callback is not None or column.get_values_callback is not None:
+        return None
+
+    if getattr(column, 'expression', None) is not None:
+        # Annotated by `annotate_columns`
+        return column.name
+
+    lookup = column.get_lookup()
+    parts = lookup.split('__')
+
+    for index, name in enumerate(parts):
+
+        try:
+            field = model._meta.get_field(name)
+
+        except FieldDoesNotExist:
+            return None
+
+        if not field.concrete:
+            return None
+
+        if index == len(parts) - 1:
+            return None if field.is_relation or field.choices else lookup
+
+        if not (field.many_to_one or field.one_to_one):
+            return None
+
+        model = field.related_model
+
+
+def get_value_lookups(model, columns):
+    """
+    Returns the `values()` lookups of the given columns, in the same order, or None when one of them needs the model
+    instance.
+    """
+
+    lookups = []
+
+    for column in columns:
+        lookup = get_value_lookup(model, column)
+
+        if lookup is None:
+            return None
+
+        lookups.append(lookup)
+
+    return lookups
+
+
+def get_table_value_lookups(table_class, model, columns):
+    """
+    Returns the `values()` lookups to fetch rows of the table as dictionaries, or None when the table needs model
+    instances. Only tables declaring `use_values` are fetched as dictionaries, as the templates showing the rows (also
+    the page template) may use the row objects; the fields of their columns are fetched as is.
+    """
+
+    if not table_class._meta.use_values:
+        return None
+
+    lookups = []
+
+    for column in columns:
+        column_lookups = column.fields if column.fields is not None else [column.get_lookup()]
+
+        if getattr(column, 'expression', None) is not None:
+            # Annotated by `annotate_columns`
+            column_lookups = list(column_lookups) + [column.name]
+
+        for lookup in column_lookups:
+            if lookup not in lookups:
+                lookups.append(lookup)
+
+    # Cached rows are identified by their primary key and version
+    if table_class._meta.cache_rows:
+        for lookup in ('pk', table_class._meta.row_version_field):
+            if lookup and lookup not in lookups:
+                lookups.append(lookup)
+
+    return lookups
+
+
+def annotate_columns(queryset, columns):
+    """
+    Annotates the queryset with the expressions of the given columns (see `ExpressionColumn`), unless it already is.
+    """
+
+    annotations = dict(
+        (column.name, column.expression)
+        for column in columns
+        if getattr(column, 'expression', None) is not None and column.name not in queryset.query.annotations
+    )
+
+    if not annotations:
+        return queryset
+
+    return queryset.annotate(**annotations)
+
+
+def iterate_in_chunks(queryset, chunk_size=1000):
+    """
+    Yields the rows of a queryset in lists of at most `chunk_size` rows. Every chunk is a query of its own, seeking past
+    the last row of the previous chunk by the sort column and primary key (see `CursorPaginator`), so neither the
+    database driver nor Python hold more than one chunk. Prefetched relations are fetched per chunk.
+    """
+
+    if not hasattr(queryset, 'query'):
+        for index in range(0, len(queryset), chunk_size):
+            yield list(queryset[index:index + chunk_size])
+
+        return
+
+    paginator = CursorPaginator(queryset, chunk_size)
+    queryset = queryset.order_by(*paginator.ordering)
+    fields = [field.lstrip('-') for field in paginator.ordering]
+    values = None
+
+    while True:
+        chunk = queryset
+
+        if values is not None:
+            chunk = chunk.filter(paginator.get_seek_filter(values, backwards=False))
+
+        rows = list(chunk[:chunk_size])
+
+        if rows:
+            yield rows
+
+        if len(rows) < chunk_size:
+            return
+
+        values = [paginator.get_row_value(rows[-1], field) for field in fields]
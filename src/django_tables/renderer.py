@@ -0,0 +1,231 @@
+from __future__ import unicode_literals, absolute_import
+
+import hashlib
+import logging
+
+from django.core.cache import caches
+from django.template.engine import Engine
+from django.utils.encoding import force_bytes, force_text
+from django.utils.html import conditional_escape, format_html
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from django_tables.base import get_column_template_name, is_package_template
+
+
+logger = logging.getLogger(__name__)
+
+
+class TableRenderer(object):
+
+    """
+    Renders the body of a table in a single pass. The template of every visible column is loaded once per render and
+    all cells are rendered against the given context, with one pushed layer per row holding `object` and `value`.
+    Columns using one of the built-in templates are formatted in Python instead.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    def get_engine(self, context):
+
+        if context.template is not None:
+            return context.template.engine
+
+        return Engine.get_default()
+
+    def get_template_names(self):
+        """
+        Returns the cell template name of every visible column, in column order.
+        """
+
+        table_class = type(self.table)
+
+        return [get_column_template_name(table_class, column) for column in self.table.columns]
+
+    def render_empty(self):
+        return format_html('<tr><td colspan="{}">{}</td></tr>', self.table.columns_count, self.table.empty_message)
+
+    def render(self, context):
+        """
+        Returns the rendered rows of the table, or a single row holding the empty message when there are no rows.
+        """
+
+        columns = self.table.columns
+        template_names = self.get_template_names()
+        engine = self.get_engine(context)
+        templates = {}
+        cells = []
+
+        for column, template_name in zip(columns, template_names):
+
+            # The formatters escape their output, so they can only stand in for the templates when autoescaping, and
+            # only for the templates of this app; a project may override those
+            formatter = None
+
+            if context.autoescape and is_package_template(engine, template_name):
+                formatter = column.get_formatter(template_name)
+
+            if formatter is None and template_name not in templates:
+                templates[template_name] = engine.get_template(template_name)
+
+            cells.append((column, template_name, formatter, '<td class="cell-{}">'.format(conditional_escape(column.name))))
+
+        table = self.table
+        rows = list(table.rows)
+        cache = self.get_row_cache()
+
+        if cache is None:
+            table.resolve_batch_values()
+            output = [self.render_row(context, row, cells, engine, templates) for row in rows]
+
+        else:
+            output = self.render_cached_rows(context, rows, cells, engine, templates, cache)
+
+        if not output:
+            return self.render_empty()
+
+        return mark_safe(''.join(output))
+
+    def render_row(self, context, row, cells, engine, templates):
+
+        table = self.table
+        output = []
+
+        with context.push(object=row) as layer:
+
+            output.append('<tr>')
+
+            for column, template_name, formatter, cell_opening in cells:
+
+                output.append(cell_opening)
+
+                try:
+                    value = table.get_value(row, column)
+
+                except AttributeError:
+                    # Without a value the template decides what to show
+                    layer.pop('value', None)
+                    output.append(self.render_template(context, engine, templates, template_name))
+
+                else:
+                    # The template engine calls callable values (e.g. methods), so those are left to the template
+                    if formatter is not None and not callable(value):
+                        output.append(formatter(value))
+
+                    else:
+                        layer['value'] = value
+                        output.append(self.render_template(context, engine, templates, template_name))
+
+                output.append('</td>')
+
+            output.append('</tr>')
+
+        return ''.join(output)
+
+    def render_template(self, context, engine, templates, template_name):
+        """
+        Renders the cell template against the context, loading it the first time when a formatter was used so far.
+        """
+
+        if template_name not in templates:
+            templates[template_name] = engine.get_template(template_name)
+
+        return templates[template_name].render(context)
+
+    def get_row_cache(self):
+        """
+        Returns the cache holding rendered rows, or None when the table does not cache its rows.
+        """
+
+        if not self.table._meta.cache_rows:
+            return None
+
+        return caches[self.table._meta.row_cache_alias]
+
+    def get_row_cache_prefix(self, context):
+        """
+        Returns what, besides the row itself, determines the rendered row: the table class, the visible columns, the
+        active language and whether the output is escaped.
+        """
+
+        table_class = type(self.table)
+
+        return '{}.{}:{}:{}:{}'.format(
+            table_class.__module__,
+            table_class.__name__,
+            ','.join(column.name for column in self.table.columns),
+            get_language(),
+            int(bool(context.autoescape))
+        )
+
+    def get_row_cache_key(self, prefix, row):
+        """
+        Returns the cache key of a rendered row, or None when the row has no primary key to identify it by.
+        """
+
+        pk = get_row_attribute(row, 'pk')
+
+        if pk is None:
+            return None
+
+        version = get_row_attribute(row, self.table._meta.row_version_field)
+
+        key = '{}:{}:{}'.format(prefix, force_text(pk), force_text(version))
+
+        return 'django_tables:row:{}'.format(hashlib.md5(force_bytes(key)).hexdigest())
+
+    def render_cached_rows(self, context, rows, cells, engine, templates, cache):
+        """
+        Returns the rendered rows, reading the cached ones with a single lookup and storing the ones rendered now at
+        once. The number of hits and misses is kept on the table as `row_cache_hits` and `row_cache_misses`.
+        """
+
+        table = self.table
+        prefix = self.get_row_cache_prefix(context)
+        keys = [self.get_row_cache_key(prefix, row) for row in rows]
+        cached = cache.get_many([key for key in keys if key is not None])
+
+        # Batch callbacks only have to provide the values of the rows which are rendered
+        table.resolve_batch_values(rows=[row for row, key in zip(rows, keys) if key not in cached])
+
+        output = []
+        rendered = {}
+
+        for row, key in zip(rows, keys):
+
+            if key in cached:
+                output.append(cached[key])
+                continue
+
+            row_output = self.render_row(context, row, cells, engine, templates)
+            output.append(row_output)
+
+            if key is not None:
+                rendered[key] = row_output
+
+        if rendered:
+            timeout = table._meta.row_cache_timeout
+
+            if timeout is None:
+                cache.set_many(rendered)
+
+            else:
+                cache.set_many(rendered, timeout)
+
+        # Rows without a key (e.g. without primary key) are never cached, so they count as misses
+        table.row_cache_hits = sum(key in cached for key in keys)
+        table.row_cache_misses = len(rows) - table.row_cache_hits
+
+        logger.debug('Rendered %s table with %d cached and %d rendered rows', prefix, table.row_cache_hits,
+                     table.row_cache_misses)
+
+        return output
+
+
+def get_row_attribute(row, name):
+
+    if isinstance(row, dict):
+        return row.get(name)
+
+    return getattr(row, name, None)
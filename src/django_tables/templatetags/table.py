@@ -1,22 +1,27 @@
-import copy
-
 from django import template
 
+from django_tables.renderer import TableRenderer
+
 
 register = template.Library()
 
 
-@register.inclusion_tag('django_tables/table.html', takes_context=True)
+@register.simple_tag(takes_context=True)
 def render_table(context, table):
 
-    # Add the table to this new context, while copying it before that to prevent
-    # messing with the global context
-    context = copy.copy(context)
-    context['table'] = table
+    # Add the table on top of the current context, the layer is popped again
+    # after rendering so the global context is left untouched
+    template = context.template.engine.get_template('django_tables/table.html')
 
-    return context
+    with context.push(table=table):
+        return template.render(context)
 
 
 @register.simple_tag(takes_context=True)
 def render_cell(context, cell):
     return cell.render(context)
+
+
+@register.simple_tag(takes_context=True)
+def render_rows(context, table):
+    return TableRenderer(table).render(context)
@@ -0,0 +1,9 @@
+from django.conf.urls import url
+
+from django_tables.views import ExportJobDownloadView, ExportJobStatusView
+
+
+urlpatterns = [
+    url(r'^exports/(?P<pk>\d+)/$', ExportJobStatusView.as_view(), name='django_tables_export_job'),
+    url(r'^exports/(?P<pk>\d+)/download/$', ExportJobDownloadView.as_view(), name='django_tables_export_job_download'),
+]
@@ -1,7 +1,37 @@
-from django.http.response import HttpResponseRedirect
-from django.views.generic import ListView
+import calendar
+import hashlib
+import json
+import logging
+import time
 
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
+from django.http.response import FileResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone, translation
+from django.utils.cache import patch_vary_headers
+from django.utils.encoding import force_bytes, force_text
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.utils.translation import get_language
+from django.views.generic import ListView, View
+
+from django_tables.export import EXPORT_FORMATS, export_json_page
+from django_tables.jobs import get_export_executor, get_refresh_executor, run_export_job
 from django_tables.mixins import TableMixin, FilterMixin, OrderByMixin, PaginationMixin
+from django_tables.models import ExportJob
+from django_tables.query import (
+    annotate_columns, get_column_fields, get_only_fields, get_related_lookups, get_table_value_lookups, get_value_lookups,
+    iterate_in_chunks
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Stands in for the CSRF token in cached pages, the token of the browser is put in its place when serving the page
+CSRF_TOKEN_PLACEHOLDER = b'django-tables-csrf-token'
 
 
 class ConfigurableTableView(TableMixin, FilterMixin, OrderByMixin, PaginationMixin, ListView):
@@ -13,6 +43,570 @@ class ConfigurableTableView(TableMixin, FilterMixin, OrderByMixin, PaginationMix
 
     paginate_by = 20
 
+    # Only load the model fields needed by the visible columns, plus the extra fields (e.g. used in templates). Opt-in,
+    # as templates reading other fields of the rows would otherwise query them row by row
+    table_field_projection = False
+    table_extra_fields = ()
+
+    # Exports the table as the user sees it (e.g. "?export=csv"), streaming the rows in chunks
+    export_parameter_name = 'export'
+    export_chunk_size = 1000
+
+    # Exports too large to stream within a request are written to a file by an export job (e.g. "?export=csv&job=1")
+    export_job_parameter_name = 'job'
+    export_in_background = False
+
+    # Serves a page of rows as JSON for tables rendered in the browser (e.g. "?format=json")
+    data_format_parameter_name = 'format'
+
+    # Caches rendered pages in the named cache for `page_cache_timeout` seconds. For another `page_cache_grace` seconds
+    # the stale page is served while a single request refreshes it in the background. Unless `page_cache_vary_on_user`
+    # is disabled, pages are cached per user for personal content; CSRF tokens are filled in per browser when serving.
+    page_cache_alias = None
+    page_cache_timeout = 60
+    page_cache_grace = 300
+    page_cache_vary_on_user = True
+
+    # Answers conditional requests with "304 Not Modified" while the rows are unchanged, judged by the latest value of
+    # this field (e.g. "updated_at") and the number of rows. See `get_table_validators`.
+    table_last_modified_field = None
+
+    # Table configurations loaded during this request, keyed by table class
+    _table_configurations = None
+
+    def __init__(self, **kwargs):
+        super(ConfigurableTableView, self).__init__(**kwargs)
+
+        # Kept to set up another instance of the view when refreshing a cached page
+        self.initkwargs = kwargs
+
+    def get(self, request, *args, **kwargs):
+
+        if self.request.GET.get(self.data_format_parameter_name) == 'json':
+            return self.render_to_json_response()
+
+        export_format = self.get_export_format()
+
+        if export_format is not None:
+            return self.render_to_export_response(export_format=export_format)
+
+        etag, last_modified = self.get_table_validators()
+
+        if self.is_not_modified(etag=etag, last_modified=last_modified):
+            response = HttpResponseNotModified()
+
+        elif self.page_cache_alias is not None:
+            response = self.get_cached_page_response()
+
+        else:
+            response = super(ConfigurableTableView, self).get(request, *args, **kwargs)
+
+        if etag is not None:
+            response['ETag'] = etag
+            patch_vary_headers(response, ('Cookie',))
+
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+
+        return response
+
+    def get_page_identity(self, vary_on_user=True):
+        """
+        Returns what determines the requested page besides the rows: the table class, the user's table configuration,
+        the query string (holding the filters, sorting and page), the active language and optionally the user.
+        """
+
+        table_class = self.get_table_class()
+        table_configuration = self.get_table_configuration(table_class=table_class)
+
+        return [
+            '{}.{}'.format(table_class.__module__, table_class.__name__),
+            sorted(table_configuration.columns or []),
+            table_configuration.order_by,
+            table_configuration.limit,
+            sorted(self.request.GET.lists()),
+            get_language(),
+            self.request.user.pk if vary_on_user else None,
+        ]
+
+    def get_page_cache_key(self):
+        """
+        Returns the cache key of the requested page, see `get_page_identity`. The CSRF token in a page (e.g. of the
+        configuration form) is not part of the key, pages are cached with a placeholder instead (see `cache_page`).
+        """
+
+        key = json.dumps(self.get_page_identity(vary_on_user=self.page_cache_vary_on_user))
+
+        return 'django_tables:page:{}'.format(hashlib.md5(force_bytes(key)).hexdigest())
+
+    def get_table_validators(self):
+        """
+        Returns the ETag and the last modification (as a timestamp) of the requested page, or None for both when the
+        view does not validate conditional requests. By default they are derived from a single aggregate query
+        fetching the latest `table_last_modified_field` and the number of filtered rows.
+        """
+
+        if self.table_last_modified_field is None:
+            return None, None
+
+        queryset = self.get_queryset()
+
+        aggregates = queryset.order_by().aggregate(last_modified=Max(self.table_last_modified_field), count=Count('pk'))
+        last_modified = aggregates['last_modified']
+
+        if last_modified is not None:
+            last_modified = calendar.timegm(last_modified.utctimetuple())
+
+        identity = self.get_page_identity() + [last_modified, aggregates['count']]
+        etag = quote_etag(hashlib.md5(force_bytes(json.dumps(identity))).hexdigest())
+
+        return etag, last_modified
+
+    def is_not_modified(self, etag, last_modified):
+        """
+        Returns whether the client's copy of the page is still valid. A matching If-None-Match header takes precedence
+        over If-Modified-Since.
+        """
+
+        if_none_match = self.request.META.get('HTTP_IF_NONE_MATCH')
+
+        if if_none_match is not None:
+            return etag is not None and (if_none_match.strip() == '*' or etag in [
+                quote_etag(tag) for tag in parse_etags(if_none_match)
+            ])
+
+        if_modified_since = parse_http_date_safe(self.request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+
+        return last_modified is not None and if_modified_since is not None and last_modified <= if_modified_since
+
+    def render_page(self):
+        """
+        Returns the rendered response of the requested page.
+        """
+
+        response = super(ConfigurableTableView, self).get(self.request, *self.args, **self.kwargs)
+
+        if hasattr(response, 'render'):
+            response.render()
+
+        return response
+
+    def cache_page(self, cache, key, response):
+        """
+        Stores a rendered page. The CSRF token the page holds is replaced by a placeholder, so the page can be served
+        to other browsers, which each get their own token (see `get_cached_page_response`). The token is the value of
+        the CSRF cookie, as rendered by the CSRF middleware of Django 1.8.
+        """
+
+        if response.status_code != 200 or response.streaming:
+            return
+
+        content = response.content
+        csrf_token = self.request.META.get('CSRF_COOKIE') if self.request.META.get('CSRF_COOKIE_USED') else None
+
+        if csrf_token:
+            content = content.replace(force_bytes(csrf_token), CSRF_TOKEN_PLACEHOLDER)
+
+        cache.set(
+            key,
+            (time.time(), content, response['Content-Type'], CSRF_TOKEN_PLACEHOLDER in content),
+            self.page_cache_timeout + self.page_cache_grace
+        )
+
+    def get_cached_page_response(self):
+        """
+        Returns the cached page when it is fresh. A stale page is returned as well, after handing its refresh to the
+        background unless another request already did. Pages which are not cached are rendered and cached.
+        """
+
+        cache = caches[self.page_cache_alias]
+        key = self.get_page_cache_key()
+        cached = cache.get(key)
+
+        if cached is None:
+            response = self.render_page()
+            self.cache_page(cache, key, response)
+
+            return response
+
+        cached_at, content, content_type, uses_csrf_token = cached
+
+        # Only the request adding the lock refreshes the page, the lock expires in case the refresh does not finish
+        if time.time() - cached_at > self.page_cache_timeout and cache.add(key + ':lock', True, self.page_cache_grace):
+            get_refresh_executor().submit(
+                self.refresh_cached_page, key,
+                language=get_language(),
+                current_timezone=timezone.get_current_timezone()
+            )
+
+        if uses_csrf_token:
+            # Like rendering the token would, this has the CSRF middleware send the cookie along with the page
+            content = content.replace(CSRF_TOKEN_PLACEHOLDER, force_bytes(get_token(self.request)))
+
+        return HttpResponse(content, content_type=content_type)
+
+    def refresh_cached_page(self, key, language, current_timezone):
+        """
+        Renders the page again with a new instance of the view and stores it. Runs on the refresh executor, so the
+        language and time zone of the request (which are kept per thread) are activated while rendering.
+        """
+
+        cache = caches[self.page_cache_alias]
+
+        try:
+            view = type(self)(**self.initkwargs)
+            view.request, view.args, view.kwargs = self.request, self.args, self.kwargs
+
+            with translation.override(language), timezone.override(current_timezone):
+                view.cache_page(cache, key, view.render_page())
+
+        except Exception:
+            logger.exception('Refreshing cached page %s failed', self.request.path)
+
+        finally:
+            cache.delete(key + ':lock')
+            connections.close_all()
+
+    def get_queryset(self):
+        queryset = super(ConfigurableTableView, self).get_queryset()
+
+        table_class = self.get_table_class()
+
+        return self.get_table_queryset(
+            queryset=queryset,
+            table_class=table_class,
+            columns=self.get_visible_columns(table_class=table_class)
+        )
+
+    def get_table_queryset(self, queryset, table_class, columns):
+        """
+        Adjusts the queryset to the visible columns, fetching the relations they show along with the rows and only
+        loading the fields they need. Hidden columns don't add anything to the query.
+        """
+
+        if not hasattr(queryset, 'model'):
+            return queryset
+
+        queryset = annotate_columns(queryset=queryset, columns=columns)
+
+        select_related, prefetch_related = get_related_lookups(model=queryset.model, columns=columns)
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        if self.table_field_projection:
+            only = self.get_only_fields(
+                model=queryset.model,
+                table_class=table_class,
+                columns=columns,
+                select_related=select_related
+            )
+
+            if only is not None:
+                queryset = queryset.only(*only)
+
+        return queryset
+
+    def get_only_fields(self, model, table_class, columns, select_related):
+        """
+        Returns the fields to load for the visible columns, or None when all fields have to be loaded.
+        """
+
+        fields = list(self.table_extra_fields)
+
+        if table_class._meta.cache_rows:
+            fields.append(table_class._meta.row_version_field)
+
+        for column in columns:
+            column_fields = get_column_fields(table_class=table_class, column=column)
+
+            if column_fields is None:
+                return None
+
+            fields.extend(column_fields)
+
+        return get_only_fields(model=model, fields=fields, select_related=select_related)
+
+    def get_visible_columns(self, table_class):
+        """
+        Returns the columns shown according to the user's table configuration.
+        """
+
+        table_configuration = self.get_table_configuration(table_class=table_class)
+
+        return table_class._meta.get_visible_columns(table_configuration.columns)
+
+    def get_export_format(self):
+        """
+        Returns the requested export format, or None when the table should be shown.
+        """
+
+        export_format = self.request.GET.get(self.export_parameter_name)
+
+        return export_format if export_format in EXPORT_FORMATS else None
+
+    def get_export_queryset(self):
+        """
+        Returns the filtered and ordered queryset of all rows, as shown on the pages of the table.
+        """
+
+        queryset = self.get_queryset()
+        order_by = self.get_order_by()
+
+        if order_by and callable(getattr(queryset, 'order_by', None)):
+            queryset = self.get_ordered(queryset, order_by)
+
+        return queryset
+
+    def get_export_rows(self, table_class, queryset):
+        """
+        Yields the values of the visible columns for every row, reading the rows in chunks.
+        """
+
+        table_configuration = self.get_table_configuration(table_class=table_class)
+
+        for chunk in iterate_in_chunks(queryset, chunk_size=self.export_chunk_size):
+
+            table = self.get_table(table_class=table_class, columns=table_configuration.columns, queryset=chunk)
+
+            for values in self.get_table_values(table):
+                yield values
+
+    def get_table_values(self, table):
+        """
+        Yields the values of the visible columns for every row of the table, None for values which can't be read.
+        """
+
+        table.resolve_batch_values()
+
+        for row in table.rows:
+            values = []
+
+            for column in table.columns:
+                try:
+                    values.append(table.get_value(row, column))
+
+                except AttributeError:
+                    values.append(None)
+
+            yield values
+
+    def get_export_filename(self, table_class, extension):
+        return '{}.{}'.format(self.get_table_name_for_table_class(table_class=table_class), extension)
+
+    def render_to_export_response(self, export_format):
+        """
+        Returns a streaming response exporting all rows of the table in the given format.
+        """
+
+        if self.should_export_in_background(export_format=export_format):
+            return self.render_to_export_job_response(export_format=export_format)
+
+        content_type, extension, export = EXPORT_FORMATS[export_format]
+
+        table_class = self.get_table_class()
+        columns = self.get_visible_columns(table_class=table_class)
+        rows = self.get_export_rows(table_class=table_class, queryset=self.get_export_queryset())
+
+        response = StreamingHttpResponse(export(columns, rows), content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="{}"'.format(
+            self.get_export_filename(table_class=table_class, extension=extension)
+        )
+
+        return response
+
+    def should_export_in_background(self, export_format):
+        """
+        Returns whether to export by a job instead of a streaming response. Jobs belong to a user, so anonymous users
+        always get a streaming response.
+        """
+
+        if self.request.user.pk is None:
+            return False
+
+        return self.export_in_background or bool(self.request.GET.get(self.export_job_parameter_name))
+
+    def get_export_executor(self):
+        return get_export_executor()
+
+    def create_export_job(self, table_class, export_format):
+        """
+        Stores an export job holding what is needed to set up this view again when running it: the view class, the
+        query string (holding the filters and sorting), the URL arguments, the user's columns and sorting and the
+        active language.
+        """
+
+        table_configuration = self.get_table_configuration(table_class=table_class)
+
+        return ExportJob.objects.create(
+            user_id=self.request.user.pk,
+            name=self.get_table_name_for_table_class(table_class=table_class),
+            export_format=export_format,
+            view='{}.{}'.format(type(self).__module__, type(self).__name__),
+            parameters={
+                'query_string': self.request.GET.urlencode(),
+                'args': list(self.args),
+                'kwargs': self.kwargs,
+                'columns': list(table_configuration.columns or []),
+                'order_by': table_configuration.order_by,
+                'language': get_language(),
+            }
+        )
+
+    @classmethod
+    def from_export_job(cls, job, request):
+        """
+        Returns an instance of the view set up like the one which created the export job, using the columns and sorting
+        stored with the job. Arguments given to `as_view` are not stored, so the view is instantiated without them.
+        """
+
+        view = cls()
+        view.request = request
+        view.args = tuple(job.parameters.get('args', ()))
+        view.kwargs = job.parameters.get('kwargs', {})
+
+        table_class = view.get_table_class()
+        table_configuration = view.get_default_table_configuration(table_class=table_class)
+        table_configuration.columns = job.parameters.get('columns', [])
+        table_configuration.order_by = job.parameters.get('order_by')
+
+        view._table_configurations = {table_class: table_configuration}
+
+        return view
+
+    def render_to_export_job_response(self, export_format):
+        """
+        Starts an export job writing the rows of the table to a file and returns where to follow its progress. Only the
+        primary key of the job is handed to the executor, the job sets up this view again to read the rows.
+        """
+
+        table_class = self.get_table_class()
+        job = self.create_export_job(table_class=table_class, export_format=export_format)
+
+        self.get_export_executor().submit(run_export_job, job.pk)
+
+        response = JsonResponse(get_export_job_data(job), status=202)
+        response['Location'] = job.get_status_url()
+
+        return response
+
+    def get_json_columns_data(self, table_class, columns):
+        """
+        Returns the metadata of all columns of the table, marking the visible ones. Rows hold the values of the visible
+        columns in the order they are listed by `visible_columns`.
+        """
+
+        visible = set(column.name for column in columns)
+
+        return [
+            {
+                'name': column.name,
+                'label': force_text(column.label),
+                'sortable': bool(column.sortable),
+                'visible': column.name in visible,
+            }
+            for name, column in table_class._meta.columns
+        ]
+
+    def get_json_pagination_data(self, paginator, page):
+
+        if page is None:
+            return None
+
+        if self.paginate_by_cursor:
+            return {
+                'per_page': paginator.per_page,
+                'next_cursor': page.next_cursor,
+                'previous_cursor': page.previous_cursor,
+            }
+
+        return {
+            'page': page.number,
+            'per_page': paginator.per_page,
+            'count': paginator.count,
+            'num_pages': paginator.num_pages,
+            'has_next': page.has_next(),
+            'has_previous': page.has_previous(),
+        }
+
+    def render_to_json_response(self):
+        """
+        Returns a streaming JSON response holding the column metadata, the sorting, the pagination and the rows of the
+        current page. When every visible column shows a plain field, the rows are fetched with `values()` instead of as
+        model instances.
+        """
+
+        table_class = self.get_table_class()
+        table_configuration = self.get_table_configuration(table_class=table_class)
+        columns = self.get_visible_columns(table_class=table_class)
+        queryset = self.get_export_queryset()
+        page_size = self.get_paginate_by(queryset)
+
+        lookups = get_value_lookups(model=queryset.model, columns=columns) if hasattr(queryset, 'values') else None
+
+        if lookups is not None:
+            queryset = self.get_values_queryset(queryset=queryset, lookups=lookups, page_size=page_size)
+
+        paginator, page = None, None
+
+        if page_size:
+            paginator, page, queryset, is_paginated = super(ConfigurableTableView, self).paginate_queryset(
+                queryset, page_size
+            )
+
+        if lookups is not None:
+            rows = ([row[lookup] for lookup in lookups] for row in queryset)
+
+        else:
+            table = self.get_table(table_class=table_class, columns=table_configuration.columns, queryset=queryset)
+            rows = self.get_table_values(table)
+
+        data = {
+            'columns': self.get_json_columns_data(table_class=table_class, columns=columns),
+            'visible_columns': [column.name for column in columns],
+            'order_by': self.get_order_by(),
+            'pagination': self.get_json_pagination_data(paginator=paginator, page=page),
+        }
+
+        return StreamingHttpResponse(export_json_page(data, rows), content_type='application/json')
+
+    def get_values_queryset(self, queryset, lookups, page_size):
+        """
+        Returns the queryset fetching the rows as dictionaries holding the given lookups, along with the fields the
+        cursor paginator needs.
+        """
+
+        fields = list(lookups)
+
+        if self.paginate_by_cursor:
+            # The cursor is made from the values of the sort column and the primary key
+            ordering = self.get_cursor_paginator(queryset, page_size).ordering
+            fields.extend(field.lstrip('-') for field in ordering if field.lstrip('-') not in fields)
+
+        return queryset.prefetch_related(None).values(*fields)
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginates the rows, fetching them as dictionaries when the table declares `use_values` (see
+        `get_table_value_lookups`).
+        """
+
+        if hasattr(queryset, 'values'):
+            table_class = self.get_table_class()
+            lookups = get_table_value_lookups(
+                table_class=table_class,
+                model=queryset.model,
+                columns=self.get_visible_columns(table_class=table_class)
+            )
+
+            if lookups is not None:
+                queryset = self.get_values_queryset(queryset=queryset, lookups=lookups, page_size=page_size)
+
+        return super(ConfigurableTableView, self).paginate_queryset(queryset, page_size)
+
     def get_paginate_by(self, queryset):
         table_class = self.get_table_class()
 
@@ -20,19 +614,46 @@ class ConfigurableTableView(TableMixin, FilterMixin, OrderByMixin, PaginationMix
 
     def get_table_configuration(self, table_class):
         """
-        Returns the initialized table configuration model for this table.
+        Returns the initialized table configuration model for this table. The configuration is loaded once per request
+        and shared by all hooks asking for it; call `clear_table_configuration` after changing it.
+        """
+
+        if self._table_configurations is None:
+            self._table_configurations = {}
+
+        if table_class not in self._table_configurations:
+            self._table_configurations[table_class] = self.load_table_configuration(table_class=table_class)
+
+        return self._table_configurations[table_class]
+
+    def load_table_configuration(self, table_class):
+        """
+        Loads the table configuration model for this table. When the user did not configure the table, an unsaved
+        configuration holding the defaults is returned; it is only stored when the user submits the configuration form.
         """
         table_configuration, created = super(ConfigurableTableView, self).get_table_configuration(
             table_class=table_class
         )
 
         if created:
-            table_configuration.limit = super(ConfigurableTableView, self).get_paginate_by(self.get_queryset())
-            table_configuration.order_by = super(ConfigurableTableView, self).get_default_order_by()
-            table_configuration.save(update_fields=['limit', 'order_by'])
+            queryset = self.object_list if hasattr(self, 'object_list') else None
+
+            table_configuration.limit = super(ConfigurableTableView, self).get_paginate_by(queryset)
 
         return table_configuration
 
+    def clear_table_configuration(self, table_class=None):
+        """
+        Forgets the table configuration loaded during this request, or all of them when no table class is given, so
+        the next call to `get_table_configuration` loads it again.
+        """
+
+        if table_class is None:
+            self._table_configurations = None
+
+        elif self._table_configurations:
+            self._table_configurations.pop(table_class, None)
+
     def get_context_data(self, **kwargs):
         context_data = super(ConfigurableTableView, self).get_context_data(**kwargs)
 
@@ -100,9 +721,70 @@ class ConfigurableTableView(TableMixin, FilterMixin, OrderByMixin, PaginationMix
                 setattr(table_configuration, field, value)
 
             keys = form.cleaned_data.keys()
-            table_configuration.save(update_fields=keys)
+            self.save_table_configuration(table_configuration=table_configuration, fields=keys)
+
+            self.clear_table_configuration(table_class=table_class)
 
         # Rebuild the URL (similar to request.get_full_path() but use the QueryDict object)
         redirect_to = '%s%s' % (request.path, ('?' + query_dict.urlencode()) if query_dict else '')
 
         return HttpResponseRedirect(redirect_to)
+
+
+def get_export_job_data(job):
+    return {
+        'id': job.pk,
+        'name': job.name,
+        'format': job.export_format,
+        'status': job.status,
+        'rows_exported': job.rows_exported,
+        'rows_total': job.rows_total,
+        'status_url': job.get_status_url(),
+        'download_url': job.get_download_url() if job.status == ExportJob.FINISHED else None,
+    }
+
+
+class ExportJobMixin(object):
+
+    def get_export_job(self, pk):
+        """
+        Returns an export job of the current user.
+        """
+
+        if self.request.user.pk is None:
+            raise Http404
+
+        return get_object_or_404(ExportJob, pk=pk, user_id=self.request.user.pk)
+
+
+class ExportJobStatusView(ExportJobMixin, View):
+
+    """
+    Returns the progress of an export job, including the download URL once it is finished.
+    """
+
+    def get(self, request, pk):
+        return JsonResponse(get_export_job_data(self.get_export_job(pk=pk)))
+
+
+class ExportJobDownloadView(ExportJobMixin, View):
+
+    """
+    Returns the file written by a finished export job.
+    """
+
+    def get(self, request, pk):
+
+        job = self.get_export_job(pk=pk)
+
+        if job.status != ExportJob.FINISHED:
+            raise Http404
+
+        content_type, extension, export = EXPORT_FORMATS[job.export_format]
+
+        job.file.open('rb')
+
+        response = FileResponse(job.file, content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="{}.{}"'.format(job.name, extension)
+
+        return response
@@ -0,0 +1,44 @@
+from __future__ import unicode_literals, absolute_import
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from django_tables.cache import (
+    NOT_CONFIGURED, cache_configuration, cache_missing_configuration, get_cached_configuration
+)
+from django_tables.models import TableConfiguration
+
+
+@override_settings(DJANGO_TABLES_CONFIGURATION_CACHE='default')
+class ConfigurationCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='user')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_missing_configuration(self):
+        cache_missing_configuration(user_id=self.user.pk, name='table')
+
+        self.assertEqual(get_cached_configuration(user_id=self.user.pk, name='table'), NOT_CONFIGURED)
+
+    def test_missing_configuration_does_not_replace_saved_configuration(self):
+        # A request read that the configuration is missing, while another request saved it
+        TableConfiguration.objects.create(user=self.user, name='table', table_class='Table', columns=['name'])
+
+        cache_missing_configuration(user_id=self.user.pk, name='table')
+
+        self.assertEqual(get_cached_configuration(user_id=self.user.pk, name='table').columns, ['name'])
+
+    def test_configuration_read_does_not_replace_saved_configuration(self):
+        table_configuration = TableConfiguration.objects.create(user=self.user, name='table', table_class='Table')
+        stale = TableConfiguration.objects.get(pk=table_configuration.pk)
+
+        table_configuration.columns = ['name']
+        table_configuration.save()
+
+        cache_configuration(stale, replace=False)
+
+        self.assertEqual(get_cached_configuration(user_id=self.user.pk, name='table').columns, ['name'])
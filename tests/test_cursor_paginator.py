@@ -0,0 +1,126 @@
+from __future__ import unicode_literals, absolute_import
+
+import base64
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.core.paginator import InvalidPage
+from django.test import TestCase
+
+from django_tables.models import ExportJob
+from django_tables.paginator import CursorPaginator
+
+
+class CursorPaginatorTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='user')
+
+    def create_jobs(self, *finished_at):
+        return [
+            ExportJob.objects.create(user=self.user, name='job', export_format='csv', finished_at=value)
+            for value in finished_at
+        ]
+
+    def get_all_pages(self, queryset, per_page):
+        """
+        Returns the primary keys of the rows on all pages, following the next cursors from the first page, and those
+        of the pages following the previous cursors back from the last page. Cursors which don't move on to the next
+        rows fail the test rather than paginating forever.
+        """
+
+        paginator = CursorPaginator(queryset, per_page=per_page)
+        max_pages = queryset.count() + 1
+
+        forward = []
+        page = paginator.page()
+
+        while True:
+            forward.extend(row.pk for row in page)
+
+            if not page.has_next():
+                break
+
+            self.assertLess(len(forward), max_pages * per_page)
+            page = paginator.page(page.next_cursor)
+
+        backward = []
+
+        while True:
+            backward[:0] = [row.pk for row in page]
+
+            if not page.has_previous():
+                break
+
+            self.assertLess(len(backward), max_pages * per_page)
+            page = paginator.page(page.previous_cursor)
+
+        return forward, backward
+
+    def assert_pages(self, queryset, per_page):
+        expected = list(queryset.order_by(*CursorPaginator(queryset, per_page=per_page).ordering)
+                        .values_list('pk', flat=True))
+
+        forward, backward = self.get_all_pages(queryset, per_page=per_page)
+
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected)
+
+    def encode(self, data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+    def test_pages_ordered_by_primary_key(self):
+        self.create_jobs(*[None] * 7)
+
+        self.assert_pages(ExportJob.objects.all(), per_page=3)
+        self.assert_pages(ExportJob.objects.order_by('-pk'), per_page=3)
+
+    def test_pages_with_null_values(self):
+        moment = datetime.datetime(2020, 1, 1, 12, 0)
+
+        self.create_jobs(None, moment, None, moment, moment + datetime.timedelta(days=1), None, moment, None)
+
+        for per_page in (1, 2, 3):
+            self.assert_pages(ExportJob.objects.order_by('finished_at'), per_page=per_page)
+            self.assert_pages(ExportJob.objects.order_by('-finished_at'), per_page=per_page)
+
+    def test_pages_keep_microseconds(self):
+        moment = datetime.datetime(2020, 1, 1, 12, 0, 0, 123456)
+
+        # The values only differ below a millisecond, which JSON encoding of datetimes would cut off
+        self.create_jobs(moment, moment.replace(microsecond=123789), moment.replace(microsecond=123001))
+
+        self.assert_pages(ExportJob.objects.order_by('finished_at'), per_page=1)
+        self.assert_pages(ExportJob.objects.order_by('-finished_at'), per_page=1)
+
+    def test_cursor_of_other_ordering_starts_at_first_page(self):
+        self.create_jobs(*[None] * 3)
+
+        cursor = CursorPaginator(ExportJob.objects.order_by('-pk'), per_page=1).page().next_cursor
+        page = CursorPaginator(ExportJob.objects.order_by('pk'), per_page=1).page(cursor)
+
+        self.assertFalse(page.has_previous())
+        self.assertEqual(page[0], ExportJob.objects.order_by('pk')[0])
+
+    def test_malformed_cursors(self):
+        self.create_jobs(None)
+
+        paginator = CursorPaginator(ExportJob.objects.order_by('finished_at'), per_page=1)
+        ordering = paginator.ordering
+
+        cursors = [
+            'not a cursor',
+            self.encode('not a list'),
+            self.encode(['next', ordering]),
+            self.encode(['next', ordering, 'not a list']),
+            self.encode(['next', ordering, [None]]),
+            self.encode(['next', ordering, [{'datetime': 'not a datetime'}, 1]]),
+            self.encode(['next', ordering, [{'unknown': 'value'}, 1]]),
+            self.encode(['next', ordering, [None, 'not a primary key']]),
+            self.encode(['next', ordering, ['not a datetime', 1]]),
+        ]
+
+        for cursor in cursors:
+            with self.assertRaises(InvalidPage):
+                paginator.page(cursor)
@@ -0,0 +1,109 @@
+from __future__ import unicode_literals, absolute_import
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.test import TestCase
+import mock
+
+from django_tables.models import ExportJob
+from django_tables.paginator import CachedCount, DiggPaginator, ExPaginator, HasNextCount
+
+
+class CountStrategyPaginatorTestCase(TestCase):
+
+    def setUp(self):
+        user = User.objects.create(username='user')
+
+        for index in range(25):
+            ExportJob.objects.create(user=user, name='job {}'.format(index), export_format='csv')
+
+        self.queryset = ExportJob.objects.order_by('pk')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_page_which_is_not_full_is_not_counted(self):
+        paginator = ExPaginator(self.queryset, 10)
+
+        with self.assertNumQueries(1):
+            page = paginator.page(3)
+
+            self.assertEqual(len(page), 5)
+            self.assertEqual(paginator.count, 25)
+            self.assertEqual(paginator.num_pages, 3)
+            self.assertFalse(page.has_next())
+
+    def test_full_page_is_counted(self):
+        paginator = ExPaginator(self.queryset, 10)
+        rows = list(self.queryset[:10])
+
+        with self.assertNumQueries(2):
+            page = paginator.page(1)
+
+            self.assertEqual(list(page), rows)
+            self.assertEqual(paginator.count, 25)
+            self.assertTrue(page.has_next())
+
+    def test_page_beyond_last_page(self):
+        paginator = ExPaginator(self.queryset, 10)
+
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+        self.assertEqual(paginator.page(4, softlimit=True).number, 3)
+
+    def test_has_next_count(self):
+        paginator = DiggPaginator(self.queryset, 10, count_strategy=HasNextCount(), align_left=True)
+
+        with self.assertNumQueries(1):
+            page = paginator.page(1)
+
+        self.assertEqual(len(page), 10)
+        self.assertEqual(paginator.count, 11)
+        self.assertTrue(page.has_next())
+        self.assertEqual(page.page_range, [1, 2])
+
+    def test_cached_count(self):
+        ExPaginator(self.queryset, 10, count_strategy=CachedCount()).page(1)
+
+        with self.assertNumQueries(1):
+            paginator = ExPaginator(self.queryset, 10, count_strategy=CachedCount())
+            paginator.page(1)
+
+            self.assertEqual(paginator.count, 25)
+
+    def test_count_executor(self):
+        executor = mock.Mock()
+        executor.submit.return_value.cancel.return_value = False
+        executor.submit.return_value.result.return_value = 25
+
+        paginator = ExPaginator(self.queryset, 10, count_executor=executor)
+
+        with self.assertNumQueries(1):
+            paginator.page(1)
+
+        self.assertTrue(executor.submit.called)
+        self.assertEqual(paginator.count, 25)
+
+    def test_count_executor_which_did_not_start_counting(self):
+        executor = mock.Mock()
+        executor.submit.return_value.cancel.return_value = True
+
+        paginator = ExPaginator(self.queryset, 10, count_executor=executor)
+
+        with self.assertNumQueries(2):
+            paginator.page(1)
+
+        self.assertFalse(executor.submit.return_value.result.called)
+        self.assertEqual(paginator.count, 25)
+
+    def test_count_executor_is_cancelled_when_rows_tell_the_count(self):
+        executor = mock.Mock()
+
+        paginator = ExPaginator(self.queryset, 10, count_executor=executor)
+        paginator.page(3)
+
+        executor.submit.return_value.cancel.assert_called_once_with()
+        self.assertFalse(executor.submit.return_value.result.called)
+        self.assertEqual(paginator.count, 25)
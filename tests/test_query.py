@@ -0,0 +1,28 @@
+from __future__ import unicode_literals, absolute_import
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase
+
+from django_tables.query import get_only_fields
+
+
+class GetOnlyFieldsTestCase(TestCase):
+
+    def test_fields_of_selected_relation(self):
+        self.assertEqual(
+            get_only_fields(Permission, ['name', 'content_type__app_label'], select_related=['content_type']),
+            ['name', 'content_type__app_label']
+        )
+
+    def test_fields_of_relation_which_is_not_selected(self):
+        self.assertEqual(get_only_fields(Permission, ['name', 'content_type__app_label']), ['name', 'content_type'])
+
+    def test_relation_loaded_whole(self):
+        fields = ['name', 'content_type', 'content_type__app_label']
+        only = get_only_fields(Permission, fields, select_related=['content_type'])
+
+        self.assertEqual(only, ['name', 'content_type'])
+
+        with self.assertNumQueries(1):
+            for permission in Permission.objects.select_related('content_type').only(*only):
+                '{} {}'.format(permission.content_type, permission.content_type.app_label)
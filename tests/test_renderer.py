@@ -0,0 +1,90 @@
+from __future__ import unicode_literals, absolute_import
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.template import Context, Engine
+from django.test import SimpleTestCase
+from django.utils.safestring import mark_safe
+
+from django_tables.base import Cell, Table
+from django_tables.column import TEMPLATE_FORMATTERS, BooleanColumn, Column, DateColumn, TextColumn
+from django_tables.renderer import TableRenderer
+
+
+VALUES = [
+    None,
+    '',
+    'text',
+    '<b>html</b> & "quotes"',
+    mark_safe('<b>safe</b>'),
+    'first line\nsecond line\r\nthird line',
+    '  <p> spaced </p>  <p>tags</p>  ',
+    0,
+    1.5,
+    True,
+    False,
+    datetime.date(2020, 1, 2),
+    datetime.datetime(2020, 1, 2, 3, 4, 5, 6),
+    datetime.time(3, 4, 5),
+]
+
+
+class UserTable(Table):
+    username = Column()
+    get_short_name = Column()
+    get_full_name = TextColumn()
+    date_joined = DateColumn()
+    is_active = BooleanColumn()
+
+    class Meta(object):
+        template_directory = 'tests/tables'
+
+
+class FormatterTestCase(SimpleTestCase):
+
+    def test_formatters_render_like_templates(self):
+        engine = Engine.get_default()
+
+        for template_name, formatter in TEMPLATE_FORMATTERS.items():
+            template = engine.get_template(template_name)
+
+            for value in VALUES:
+                self.assertEqual(
+                    formatter(value),
+                    template.render(Context({'value': value})),
+                    '{} renders {!r} differently'.format(template_name, value)
+                )
+
+    def test_rows_render_like_cells(self):
+        users = [
+            User(username='bob', first_name='Bob', last_name='<Builder>',
+                 date_joined=datetime.datetime(2020, 1, 2, 3, 4, 5)),
+            User(username='', first_name='', is_active=False, date_joined=datetime.datetime(2020, 1, 2)),
+        ]
+
+        table = UserTable(visible_columns=[name for name, column in UserTable._meta.columns], rows=users)
+
+        expected = ''.join(
+            '<tr>{}</tr>'.format(''.join(
+                '<td class="cell-{}">{}</td>'.format(cell.column.name, cell.render(Context())) for cell in row
+            ))
+            for row in table
+        )
+
+        self.assertEqual(TableRenderer(table).render(Context()), expected)
+        self.assertIn('<td class="cell-get_short_name">Bob\n</td>', expected)
+
+
+class RowCacheTestCase(SimpleTestCase):
+
+    def test_row_version_field_is_required(self):
+
+        with self.assertRaises(ImproperlyConfigured):
+
+            class CachedTable(Table):
+                username = Column()
+
+                class Meta(object):
+                    cache_rows = True